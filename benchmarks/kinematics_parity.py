@@ -0,0 +1,48 @@
+"""Check that the NumPy kinematics engine gives the same games as moving the sprites one by one.
+
+Every level is simulated with the same seeds on both paths, the level checksums are compared
+after each frame and the first divergent frame is reported. Exits with status 1 on any difference.
+
+Run from the project folder: python benchmarks/kinematics_parity.py [--frames 3000] [--seeds 1 2 3]"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame
+from src.core import Level, Simulation
+from src.settings import PERFORMANCE
+from src.sprite.kinematics import np
+
+def checksums(level_number: int, seed: int, frames: int, numpy_kinematics: bool) -> list[int]:
+    """Level checksums after each simulated frame on the given path."""
+    PERFORMANCE.NUMPY_KINEMATICS = numpy_kinematics
+    simulation = Simulation(level_number, seed = seed)
+    result = []
+    for _ in range(frames):
+        simulation.step()
+        result.append(simulation.level.checksum())
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("--frames", type = int, default = 3000, help = "simulated frames per level and seed")
+    parser.add_argument("--seeds", type = int, nargs = "+", default = [1, 2, 3], help = "seeds to simulate each level with")
+    args = parser.parse_args()
+    if np is None:
+        sys.exit("The kinematics engine requires numpy.")
+    Simulation.init()
+    numpy_kinematics = PERFORMANCE.NUMPY_KINEMATICS
+    failures = 0
+    for level_number in range(Level(0).max_level + 1):
+        for seed in args.seeds:
+            per_sprite = checksums(level_number, seed, args.frames, False)
+            engine = checksums(level_number, seed, args.frames, True)
+            divergent = next((frame for frame, (a, b) in enumerate(zip(per_sprite, engine)) if a != b), None)
+            failures += divergent is not None
+            status = "OK" if divergent is None else f"diverged at frame {divergent}"
+            print(f"level {level_number} seed {seed}: {status}")
+    PERFORMANCE.NUMPY_KINEMATICS = numpy_kinematics
+    pygame.quit()
+    sys.exit(1 if failures else 0)
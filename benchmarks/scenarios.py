@@ -0,0 +1,160 @@
+"""Scenario benchmarks measuring frame times of headless game levels.
+
+Every scenario loads a game level (optionally with additional stress enemies),
+simulates it for a fixed number of frames with synthetic player input and measures
+the time spent per frame on updating the sprites, on collision checks and on rendering.
+Percentiles p50/p95/p99 of these phases are printed and written to a JSON file,
+pass a former result with --compare to diff builds.
+
+Run from the project folder: python benchmarks/scenarios.py [--frames 300] [--output results.json]"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame
+from src.core import Level, Simulation, SyntheticInput
+from src.gui import Statusbar
+from src.settings import SCREEN
+from src.sprite import BOUNDARY
+from src.templates import ALIEN
+from src.utils import Display
+from random import Random
+
+PHASES = ("update", "collision", "render", "total")
+
+@dataclass
+class Scenario:
+    name: str
+    level_number: int
+    setup: Callable[[Level], None] | None = None # adds stress enemies to the loaded level
+
+def add_asteroids(amount: int) -> Callable[[Level], None]:
+    def setup(level: Level):
+        level.encounter(ALIEN.BIG_ASTEROID, amount // 2, boundary_behaviour = BOUNDARY.REFLECT)
+        level.encounter(ALIEN.SMALL_ASTEROID, amount - amount // 2, boundary_behaviour = BOUNDARY.REFLECT)
+    return setup
+
+def add_blobs(amount: int) -> Callable[[Level], None]:
+    def setup(level: Level):
+        level.encounter(ALIEN.BLOB, amount, energy = 1, boundary_behaviour = BOUNDARY.REFLECT)
+    return setup
+
+SCENARIOS = [Scenario(f"level_{number}", number) for number in range(1, 6)]
+SCENARIOS += [Scenario(f"asteroids_{amount}", 1, add_asteroids(amount)) for amount in (100, 500, 2000)]
+SCENARIOS += [Scenario(f"blobs_{amount}", 4, add_blobs(amount)) for amount in (100, 500, 2000)]
+
+class PhaseTimer:
+    """Accumulate the time spent in wrapped methods during the current frame."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def wrap(self, method: Callable) -> Callable:
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.elapsed += perf_counter() - start
+        return timed
+
+def run_scenario(scenario: Scenario, frames: int, dt: int, seed: int, render: bool) -> dict:
+    """Simulate a scenario, return percentiles of its frame times in ms and its final sprite counts."""
+    level = Level(scenario.level_number, seed = seed)
+    if scenario.setup is not None:
+        # Stress enemies get added whenever the level gets (re)loaded, e.g. after the ship lost a life
+        load_level = level.load_level
+        def load_stress_level(number: int):
+            load_level(number)
+            scenario.setup(level)
+        level.load_level = load_stress_level
+    level.start_current()
+    player = SyntheticInput(Random(seed))
+    # Collision checks are timed separately by shadowing the level's methods on the instance
+    collision = PhaseTimer()
+    level.asteroids_collide = collision.wrap(level.asteroids_collide)
+    level.collision_checks = collision.wrap(level.collision_checks)
+    times = {phase: [] for phase in PHASES}
+    for _ in range(frames):
+        collision.elapsed = 0.0
+        start = perf_counter()
+        player.apply(level)
+        level.update(dt)
+        updated = perf_counter()
+        if render:
+            Display.screen.fill(SCREEN.BG_COLOR)
+            Statusbar.blit(level)
+            level.blit()
+        rendered = perf_counter()
+        times["update"].append(updated - start - collision.elapsed)
+        times["collision"].append(collision.elapsed)
+        times["render"].append(rendered - updated)
+        times["total"].append(rendered - start)
+    result = {phase: statistics(values) for phase, values in times.items()}
+    result["sprites"] = {name: len(getattr(level, name)) for name in
+                        ("bullets", "asteroids", "aliens", "blobs", "items")}
+    return result
+
+def statistics(values: list[float]) -> dict[str, float]:
+    """Mean and percentiles of frame times in ms."""
+    ms = [1000 * value for value in values]
+    percentiles = quantiles(ms, n = 100, method = "inclusive") if len(ms) > 1 else ms * 99
+    return {"mean": round(mean(ms), 4), "p50": round(percentiles[49], 4),
+            "p95": round(percentiles[94], 4), "p99": round(percentiles[98], 4)}
+
+def metadata(args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True,
+                                text = True, cwd = Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "pygame": pygame.version.ver,
+            "platform": platform.platform(), "screen_size": Display.screen_size,
+            "frames": args.frames, "dt": args.dt, "seed": args.seed, "render": not args.no_render}
+
+def print_row(name: str, result: dict, baseline: dict | None = None):
+    cells = []
+    for phase in PHASES:
+        p50, p95, p99 = (result[phase][p] for p in ("p50", "p95", "p99"))
+        cells.append(f"{p50:7.2f} {p95:7.2f} {p99:7.2f}")
+    line = f"{name:<15}" + " |".join(cells)
+    if baseline is not None:
+        change = result["total"]["p50"] / baseline["total"]["p50"] - 1 if baseline["total"]["p50"] else 0
+        line += f" | {change:+7.1%}"
+    print(line)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Run headless scenario benchmarks of the game.")
+    parser.add_argument("--frames", type = int, default = 300, help = "simulated frames per scenario")
+    parser.add_argument("--dt", type = int, default = 16, help = "simulated ms per frame")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of levels and synthetic input")
+    parser.add_argument("--no-render", action = "store_true", help = "skip rendering the levels")
+    parser.add_argument("--only", nargs = "+", metavar = "NAME", help = "run only scenarios with these name prefixes")
+    parser.add_argument("--output", type = Path, default = Path("benchmarks/results.json"), help = "JSON result file")
+    parser.add_argument("--compare", type = Path, metavar = "JSON", help = "former result to compare p50 total frame times with")
+    args = parser.parse_args()
+
+    Simulation.init()
+    baseline = json.loads(args.compare.read_text())["scenarios"] if args.compare else {}
+    scenarios = [s for s in SCENARIOS if not args.only or s.name.startswith(tuple(args.only))]
+    print(f"{'ms per frame':<15}" + " |".join(f"{phase:^23}" for phase in PHASES))
+    print(f"{'scenario':<15}" + " |".join(f"{'p50':>7} {'p95':>7} {'p99':>7}" for _ in PHASES))
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(scenario, args.frames, args.dt, args.seed, not args.no_render)
+        print_row(scenario.name, results[scenario.name], baseline.get(scenario.name))
+    args.output.parent.mkdir(parents = True, exist_ok = True)
+    args.output.write_text(json.dumps({"meta": metadata(args), "scenarios": results}, indent = 2))
+    print(f"Results written to {args.output}")
+    pygame.quit()
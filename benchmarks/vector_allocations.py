@@ -0,0 +1,90 @@
+"""Micro-benchmark counting Vector allocations per frame while running game levels,
+compared with the allocating path Vector had before its in-place operations.
+
+Each seeded level is played twice for the same number of frames: once as is and once with
+Vector's in-place operations replaced by their operator equivalents, which allocate their results
+like the former vectors did. Both give the same results, so the level takes the same course.
+Zero accelerations, which the former update_vel also added, are skipped on both runs,
+so the allocating count is a lower bound.
+
+Run from the project folder: python benchmarks/vector_allocations.py [frames]"""
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame
+from src.core import Level, Simulation
+from src.sprite import SpritePool
+from src.utils import Vector
+
+class DictVector(Vector):
+    """Vector with an instance dict, the memory layout of the former vectors."""
+
+def count_vector_allocations(level: Level, frames: int, dt: int = 16) -> tuple[int, float]:
+    """Update the level for the given number of frames,
+    return the number of constructed vectors and the elapsed time in s."""
+    count = 0
+    def profiler(frame, event, arg):
+        nonlocal count
+        if event == "call" and frame.f_code is Vector.__init__.__code__:
+            count += 1
+    start = perf_counter()
+    sys.setprofile(profiler)
+    try:
+        for _ in range(frames):
+            level.update(dt)
+    finally:
+        sys.setprofile(None)
+    return count, perf_counter() - start
+
+@contextmanager
+def allocating_vectors():
+    """Replace Vector's in-place operations by their operator equivalents, e.g. iadd by self + factor * other."""
+    def assign(vector: Vector, result: Vector) -> Vector:
+        vector.x, vector.y = result.x, result.y
+        return vector
+    replacements = {
+        "set": lambda self, x, y: assign(self, Vector(x, y)),
+        "iadd": lambda self, other, factor = 1: assign(self, self + factor * other),
+        "scale_": lambda self, s: assign(self, s * self),
+        "normalize_": lambda self: assign(self, self.normalize),
+        "clamp_into": lambda self, x_min, y_min, x_max, y_max: assign(self, self.clamp(Vector(x_min, y_min), Vector(x_max, y_max))),
+    }
+    originals = {name: getattr(Vector, name) for name in replacements}
+    for name, method in replacements.items():
+        setattr(Vector, name, method)
+    try:
+        yield
+    finally:
+        for name, method in originals.items():
+            setattr(Vector, name, method)
+
+def play(number: int, frames: int) -> tuple[int, float, int]:
+    """Vector allocations, elapsed time and final checksum of the seeded level, starting with empty sprite pools."""
+    for pool in SpritePool.pools:
+        pool.clear()
+    level = Level(number, seed = number)
+    level.start_current()
+    count, elapsed = count_vector_allocations(level, frames)
+    return count, elapsed, level.checksum()
+
+def vector_bytes(vector: Vector) -> int:
+    return sys.getsizeof(vector) + (sys.getsizeof(vector.__dict__) if hasattr(vector, "__dict__") else 0)
+
+if __name__ == '__main__':
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    Simulation.init()
+    print(f"Memory per Vector: {vector_bytes(Vector(0, 0))} bytes (with instance dict: {vector_bytes(DictVector(0, 0))} bytes)")
+    print(f"{'level':>5} {'vectors/frame':>14} {'allocating':>11} {'reduction':>10} {'ms/frame (profiled)':>20}")
+    for number in range(1, 6):
+        with allocating_vectors():
+            allocating, _, allocating_checksum = play(number, frames)
+        count, elapsed, checksum = play(number, frames)
+        if checksum != allocating_checksum:
+            print(f"Warning: level {number} took a different course on the allocating path")
+        print(f"{number:>5} {count / frames:>14.1f} {allocating / frames:>11.1f} {1 - count / max(allocating, 1):>10.0%} "
+              f"{1000 * elapsed / frames:>20.2f}")
+    pygame.quit()
@@ -1,15 +1,80 @@
-from src.core import Game
+from src.core import Game, Simulation, ReplayPlayer, Preloader
+from src.settings import PATH, SCREEN
+from src.utils import SamplingProfiler, MemoryStats
+import argparse
 import sys
 
-if __name__ == '__main__':
-    # Make a game instance, and run the game.
+def seed(value: str) -> int:
+    """Argument type of seeds, replays record them as unsigned 32 bit integers."""
+    number = int(value)
+    if not 0 <= number < 2**32:
+        raise argparse.ArgumentTypeError(f"must be between 0 and {2**32 - 1}, got {number}")
+    return number
+
+def replay(player: ReplayPlayer, repeat: int):
+    """Play a replay repeatedly and report the frame rate and whether the checksums matched."""
+    for _ in range(repeat):
+        result = player.play()
+        status = "OK" if result.divergent_frame is None else f"diverged at frame {result.divergent_frame}"
+        print(f"Replayed {result.frames} frames at {result.fps:.0f} fps: {status}")
 
-    mute = False # Mute game if playing in a container without access to sound hardware
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="A small space shooter game.")
+    parser.add_argument("--mute", action="store_true",
+                        help="mute game if playing in a container without access to sound hardware")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate a level with synthetic input without display and sound, report the frame rate")
+    parser.add_argument("--level", type=int, default=1, help="level to simulate in headless mode")
+    parser.add_argument("--frames", type=int, default=10000, help="number of frames to simulate in headless mode")
+    parser.add_argument("--dt", type=int, default=16, help="simulated milliseconds per frame in headless mode")
+    parser.add_argument("--render", action="store_true", help="also render the level in headless mode")
+    parser.add_argument("--seed", type=seed, default=None, help="seed for reproducible games and headless simulations")
+    parser.add_argument("--record", metavar="FILE", help="record the player's input into a replay file")
+    parser.add_argument("--replay", metavar="FILE", help="replay a recorded game headless at full speed")
+    parser.add_argument("--repeat", type=int, default=1, help="number of times to play the replay")
+    parser.add_argument("--profile", metavar="FILE", nargs="?", const=PATH.PROFILE,
+                        help=f"sample the game's call stacks into a flamegraph-ready collapsed stacks file (default: {PATH.PROFILE.relative_to(PATH.BASE)})")
+    parser.add_argument("--memory-report", metavar="FILE", nargs="?", const=PATH.MEMORY_REPORT,
+                        help=f"export the memory used by images per level to a JSON file at the end (default: {PATH.MEMORY_REPORT.relative_to(PATH.BASE)})")
+    parser.add_argument("--prebake", metavar="GRID_WIDTH", type=int, nargs="+",
+                        help=f"preprocess and pack the images for the given grid widths (screen width / {SCREEN.GRID[0]}) to ship them with the game")
+    parser.add_argument("--processes", type=int, default=None, help="number of worker processes for --prebake (default: all cores)")
+    args, unknown = parser.parse_known_args()
+    # Bare "mute" is still accepted as in earlier versions.
+    if any(arg != "mute" for arg in unknown):
+        parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+    mute = args.mute or "mute" in unknown
 
-    if "mute" in sys.argv:
-        mute = True
-    
-    game = Game()
-    game.run(mute)
+    if args.prebake:
+        Preloader.prebake(args.prebake, processes = args.processes,
+                          progress = lambda grid_width, count, seconds: print(f"grid_width={grid_width}: {count} images in {seconds:.1f} s"))
+    elif args.replay:
+        player = ReplayPlayer(args.replay)
+        Simulation.init(window_size = player.window_size)
+        if args.profile:
+            with SamplingProfiler(tags = lambda: ("replay", f"level {player.level.number if player.level else player.level_number}")) as profiler:
+                replay(player, args.repeat)
+            profiler.write(args.profile)
+        else:
+            replay(player, args.repeat)
+        if args.memory_report:
+            MemoryStats.export(args.memory_report)
+    elif args.headless:
+        Simulation.init()
+        simulation = Simulation(args.level, render = args.render, dt = args.dt, seed = args.seed)
+        if args.profile:
+            with SamplingProfiler(tags = lambda: ("headless", f"level {simulation.level.number}")) as profiler:
+                fps = simulation.run(args.frames)
+            profiler.write(args.profile)
+        else:
+            fps = simulation.run(args.frames)
+        if args.memory_report:
+            MemoryStats.export(args.memory_report)
+        print(simulation.report(fps))
+    else:
+        # Make a game instance, and run the game.
+        game = Game(seed = args.seed, record = args.record, profile = args.profile,
+                    memory_report = args.memory_report)
+        game.run(mute)
 
-    sys.exit()
\ No newline at end of file
+    sys.exit()
@@ -1,6 +1,11 @@
 from .game import Game
 from .highscores import Highscores
 from .level import Level
+from .simulation import Simulation, SyntheticInput
+from .replay import InputRecorder, ReplayPlayer
+from .environment import Environment, VectorEnvironment
+from .preload import Preloader
 __all__ = [
-    Game, Highscores, Level
+    Game, Highscores, Level, Simulation, SyntheticInput, InputRecorder, ReplayPlayer,
+    Environment, VectorEnvironment, Preloader
 ]
\ No newline at end of file
@@ -0,0 +1,224 @@
+from __future__ import annotations
+import os
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from .level import Level
+from .simulation import Simulation
+from .replay import KeyState
+from src.settings import SCREEN, LEVEL_STATUS, REPLAY
+from src.utils import Display, Observation
+from random import Random
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Environment:
+    """Gym-style environment wrapping a headless game level for training agents.
+
+    Actions are integers 0 <= action < NUM_ACTIONS, their bits 0-4 press
+    the keys LEFT, RIGHT, UP, DOWN, SHIELD and bit 5 shoots bullets.
+    Observations are the rendered level, scaled to obs_size, as uint8 arrays of shape
+    (stack,) height, width (, 3), see Observation.
+    The reward is the increase of the player's score, an episode terminates when the level ends.
+
+    level_number: int - Level played in each episode.
+    obs_size: tuple[int, int] | None - Width and height of observations, None keeps the screen size.
+    grayscale: bool - Observe grayscale instead of RGB frames.
+    stack: int - Number of most recent frames stacked into an observation.
+    frame_skip: int - Number of frames each action is repeated for.
+    dt: int - Simulated milliseconds per frame.
+    max_frames: int | None - Episodes get truncated after this number of frames.
+    seed: int | None - Seed for the random number generators of all episodes."""
+    SHOOT = 1 << len(REPLAY.KEYS)
+    NUM_ACTIONS = 2 * SHOOT
+
+    def __init__(self, level_number: int = 1,
+                obs_size: tuple[int, int] | None = (84, 84),
+                grayscale: bool = False,
+                stack: int = 1,
+                frame_skip: int = 1,
+                dt: int = 16,
+                max_frames: int | None = None,
+                seed: int | None = None):
+        if np is None:
+            raise ImportError("The environment requires numpy.")
+        if Display.screen is None:
+            Simulation.init()
+        self.level_number = level_number
+        self.observation = Observation(obs_size, grayscale, stack)
+        self.obs_shape = self.observation.shape
+        self.frame_skip = frame_skip
+        self.dt = dt
+        self.max_frames = max_frames
+        self.rng = Random(seed)
+        self.keys = KeyState()
+        self.level = None
+        self.frames = 0
+
+    def reset(self, seed: int | None = None, out: np.ndarray | None = None) -> tuple[np.ndarray, dict]:
+        """Start a new episode, return the first observation and info.
+        If given, the observation gets written into the array out."""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.level = Level(self.level_number, seed = self.rng.getrandbits(32))
+        self.level.start_current()
+        self.frames = 0
+        self.render()
+        return self.output(self.observation.reset(), out), self.info
+
+    def step(self, action: int, out: np.ndarray | None = None) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """Apply an action for frame_skip frames.
+        Return observation, reward, terminated, truncated and info."""
+        for bit, key in enumerate(REPLAY.KEYS):
+            self.keys[key] = bool(action & 1 << bit)
+        score = self.level.ship.score
+        terminated = False
+        for _ in range(self.frame_skip):
+            if action & self.SHOOT:
+                self.level.ship.shoot_bullets()
+            self.level.ship.control(self.keys)
+            self.level.update(self.dt)
+            self.frames += 1
+            terminated = self.level.status not in (LEVEL_STATUS.RUNNING, LEVEL_STATUS.START)
+            if terminated:
+                break
+        truncated = not terminated and self.max_frames is not None and self.frames >= self.max_frames
+        return self.observe(out), float(self.level.ship.score - score), terminated, truncated, self.info
+
+    def render(self):
+        Display.screen.fill(SCREEN.BG_COLOR)
+        self.level.blit(Display.screen)
+
+    def observe(self, out: np.ndarray | None = None) -> np.ndarray:
+        """Render the level and return the observation."""
+        self.render()
+        return self.output(self.observation.capture(), out)
+
+    @staticmethod
+    def output(observation: np.ndarray, out: np.ndarray | None) -> np.ndarray:
+        """Copy the observation into out, if given, or into a new array."""
+        if out is None:
+            return observation.copy()
+        np.copyto(out, observation)
+        return out
+
+    @property
+    def info(self) -> dict:
+        ship = self.level.ship
+        return {"level": self.level.number, "status": self.level.status, "score": ship.score,
+                "lives": ship.lives, "energy": ship.energy, "frames": self.frames}
+
+def _worker(index: int, connection, shm_names: dict[str, str], num_envs: int, env_kwargs: dict):
+    """Run one environment in a worker process of a VectorEnvironment."""
+    env = Environment(**env_kwargs)
+    buffers = VectorBuffers(num_envs, env.obs_shape, shm_names)
+    obs, actions = buffers.observations[index], buffers.actions
+    try:
+        while True:
+            command, arg = connection.recv()
+            match command:
+                case "reset":
+                    _, info = env.reset(seed = arg, out = obs)
+                case "step":
+                    _, reward, terminated, truncated, info = env.step(int(actions[index]), out = obs)
+                    buffers.rewards[index] = reward
+                    buffers.terminated[index] = terminated
+                    buffers.truncated[index] = truncated
+                    if terminated or truncated:
+                        # Start the next episode automatically, the info keeps the final stats.
+                        env.reset(out = obs)
+                case "close":
+                    break
+            connection.send(info)
+    finally:
+        buffers.close()
+        connection.close()
+
+class VectorBuffers:
+    """Arrays in shared memory exchanged between a VectorEnvironment and its workers."""
+    FIELDS = {"observations": np.uint8, "actions": np.int64, "rewards": np.float64,
+              "terminated": np.bool_, "truncated": np.bool_} if np is not None else {}
+
+    def __init__(self, num_envs: int, obs_shape: tuple[int, ...], names: dict[str, str] | None = None):
+        """Create new shared memory blocks, or attach to existing ones with the given names."""
+        self.owner = names is None
+        self.memory = {}
+        for field, dtype in self.FIELDS.items():
+            shape = (num_envs, *obs_shape) if field == "observations" else (num_envs,)
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            memory = SharedMemory(create = True, size = size) if self.owner else SharedMemory(name = names[field])
+            self.memory[field] = memory
+            setattr(self, field, np.ndarray(shape, dtype = dtype, buffer = memory.buf))
+
+    @property
+    def names(self) -> dict[str, str]:
+        return {field: memory.name for field, memory in self.memory.items()}
+
+    def close(self):
+        for field in self.FIELDS:
+            delattr(self, field)
+        for memory in self.memory.values():
+            memory.close()
+            if self.owner:
+                memory.unlink()
+
+class VectorEnvironment:
+    """Run num_envs environments in parallel worker processes.
+    Observations, actions, rewards and done flags are exchanged through shared memory,
+    only short commands and info dicts get pickled.
+    The returned observations are a view of the shared buffer, valid until the next step.
+    Finished episodes get reset automatically."""
+
+    def __init__(self, num_envs: int, **env_kwargs):
+        if np is None:
+            raise ImportError("The environment requires numpy.")
+        self.num_envs = num_envs
+        obs_shape = Observation.shape_of(env_kwargs.get("obs_size", (84, 84)) or SCREEN.SIZE,
+                        env_kwargs.get("grayscale", False), env_kwargs.get("stack", 1))
+        self.buffers = VectorBuffers(num_envs, obs_shape)
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        context = mp.get_context("spawn")
+        self.connections, self.processes = [], []
+        seed = env_kwargs.pop("seed", None)
+        for index in range(num_envs):
+            parent, child = context.Pipe()
+            kwargs = dict(env_kwargs, seed = None if seed is None else seed + index)
+            process = context.Process(target = _worker, daemon = True,
+                        args = (index, child, self.buffers.names, num_envs, kwargs))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.closed = False
+
+    def _broadcast(self, command: str, args: list) -> list[dict]:
+        for connection, arg in zip(self.connections, args):
+            connection.send((command, arg))
+        return [connection.recv() for connection in self.connections]
+
+    def reset(self, seed: int | None = None) -> tuple[np.ndarray, list[dict]]:
+        seeds = [None if seed is None else seed + index for index in range(self.num_envs)]
+        return self.buffers.observations, self._broadcast("reset", seeds)
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        self.buffers.actions[:] = actions
+        infos = self._broadcast("step", [None] * self.num_envs)
+        b = self.buffers
+        return b.observations, b.rewards.copy(), b.terminated.copy(), b.truncated.copy(), infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for connection, process in zip(self.connections, self.processes):
+            connection.send(("close", None))
+            process.join()
+            connection.close()
+        self.buffers.close()
+
+    def __enter__(self) -> VectorEnvironment:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
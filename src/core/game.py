@@ -1,47 +1,101 @@
 import pygame
-from src.settings import KEY, SCREEN, GAME_MODE, LEVEL_STATUS
+from src.settings import KEY, SCREEN, GAME_MODE, LEVEL_STATUS, REPLAY, COLOR, FONT
 from .level import Level
 from .highscores import Highscores
-from src.utils import Vector, Sound, Display
-from src.gui import Menu, Statusbar
+from .replay import InputRecorder
+from .preload import Preloader
+from src.utils import Vector, Sound, Display, Perf, SamplingProfiler, MemoryStats
+from src.gui import Menu, Statusbar, PerfHud
+from pathlib import Path
+from random import randrange
 
 class Game:
     """Initiates the game's modules, starts rendering loop,
     coordinates the game's interaction with user input, opens menus"""
 
-    def __init__(self):
-        """Initialize the game's display surface and starting stats"""
+    def __init__(self, seed: int | None = None, record: str | Path | None = None,
+                profile: str | Path | None = None, memory_report: str | Path | None = None):
+        """Initialize the game's display surface and starting stats.
+        seed: seed for the level's random number generator (random if not provided)
+        record: optional path of a replay file recording the player's input
+        profile: optional path of a collapsed stacks file, written by a sampling profiler running during the game
+        memory_report: optional path of a JSON file, the memory used by images gets exported to when the game ends"""
         pygame.init()
         self.screen = Display.init(SCREEN.SIZE, SCREEN.GRID)
+        self.loading_font = pygame.font.Font(FONT.TEXT, max(Display.grid_width // 4, 8))
+        Preloader.run(progress = self.show_loading_progress)
         self.player_name = "" # Gets entered when achieving a high score 
         Menu.init_settings()
-        self.level = Level(0) # Level 0 = starting screen
+        self.seed = seed if seed is not None else randrange(2**32)
+        self.level = Level(0, seed = self.seed) # Level 0 = starting screen
+        self.recorder = None
+        if record is not None:
+            self.recorder = InputRecorder(record, self.seed, Display.display.get_size(), self.level.number)
+        self.profile = profile
+        self.memory_report = memory_report
         self.highscores = Highscores()  
         self.clock = pygame.time.Clock()
 
+    def show_loading_progress(self, loaded: int, total: int):
+        """Draw a progress bar while the images get preloaded."""
+        pygame.event.pump() # keep the window responsive
+        self.screen.fill(SCREEN.BG_COLOR)
+        text = self.loading_font.render(f"Loading images {loaded}/{total}", False, COLOR.WHITE)
+        bar = pygame.Rect(0, 0, 8 * Display.grid_width, Display.grid_width // 4)
+        bar.center = self.screen.get_rect().center
+        self.screen.blit(text, text.get_rect(midbottom = (bar.centerx, bar.top - Display.grid_width // 8)))
+        pygame.draw.rect(self.screen, COLOR.WHITE, (bar.x, bar.y, bar.w * loaded // total, bar.h))
+        pygame.draw.rect(self.screen, COLOR.WHITE, bar, 1)
+        Display.update(padding_color = SCREEN.PADDING_COLOR)
+
     def run(self, mute: bool = False):
         """Starts the main loop for the game."""
         self.mode = GAME_MODE.MENU  # possible modes: "game", "menu", "enter name" (for highscores)
         self.active_menu = Menu.create_main_menu(self)
         Sound.init(mute)
         self.level.start_current()
+        profiler = None
+        if self.profile is not None:
+            # Samples are tagged with the game mode and level, to profile the menu and each level separately
+            profiler = SamplingProfiler(tags = lambda: (self.mode, f"level {self.level.number}"))
+            profiler.start()
 
         #main loop of the game
         while self.mode != GAME_MODE.EXIT:
             self.handle_user_input()
+            Perf.end_frame(context = f"{self.mode} level {self.level.number}")
 
             # measure passed time dt since last frame, limit frame rate to 60fps
             dt = self.clock.tick(60)
+            Perf.begin_frame()
             
             # run the game's level for dt milliseconds (pause if in menu mode)
-            if self.mode == GAME_MODE.GAME or self.level.status == LEVEL_STATUS.START:
+            updated = self.mode == GAME_MODE.GAME or self.level.status == LEVEL_STATUS.START
+            if updated:
                 self.level.update(dt) # update all ingame objects
+            if self.recorder is not None:
+                self.recorder.end_frame(self.level, dt if updated else None)
+            if updated:
                 if self.level.status != LEVEL_STATUS.RUNNING and self.level.status != LEVEL_STATUS.START:
                     self.active_menu = Menu.create_level_menu(self.level)
                     self.mode = GAME_MODE.MENU
             self.render()
+        if self.recorder is not None:
+            self.recorder.close()
+        Perf.close_log()
+        if profiler is not None:
+            profiler.stop()
+            profiler.write(self.profile)
+        if self.memory_report is not None:
+            MemoryStats.export(self.memory_report)
         pygame.quit()
 
+    def record(self, event_type: int, pos: Vector | None = None):
+        """Record a level-affecting input event if the game gets recorded."""
+        if self.recorder is not None:
+            self.recorder.event(event_type, pos)
+
+    @Perf.timed("handle_user_input")
     def handle_user_input(self):
         """handles keyboard and mouse events on each frame"""
         for event in pygame.event.get():
@@ -54,6 +108,11 @@ class Game:
                 self.mode = GAME_MODE.EXIT
                 break
 
+            # F3 shows or hides the performance HUD
+            if event.type == pygame.KEYDOWN and event.key == KEY.PERF_HUD:
+                PerfHud.toggle()
+                continue
+
             # The game's reaction on pressing or releasing keys and mouse buttons
             if self.mode == GAME_MODE.GAME:
                 if event.type == pygame.KEYDOWN:
@@ -64,9 +123,12 @@ class Game:
                         break
                     # SPACE shoots bullets
                     elif event.key == KEY.SHOOT:
+                        self.record(REPLAY.SHOOT)
                         self.level.ship.shoot_bullets()
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    self.level.ship.shoot_missile(Vector(event.pos[0],event.pos[1]))
+                    pos = Vector(event.pos[0],event.pos[1])
+                    self.record(REPLAY.MISSILE, pos)
+                    self.level.ship.shoot_missile(pos)
 
             # Enter the name into the high score table
             if self.mode == GAME_MODE.ENTER_NAME:
@@ -86,6 +148,8 @@ class Game:
         # Ship direction and shield are set according to the keys' current states
         if self.mode == GAME_MODE.GAME:
             keys = pygame.key.get_pressed()
+            if self.recorder is not None:
+                self.recorder.keys(keys)
             self.level.ship.control(keys)   
 
     def render(self):
@@ -95,4 +159,5 @@ class Game:
         self.level.blit() # ship, enemies, items, bullets, crosshairs
         if self.mode == GAME_MODE.MENU or self.mode == GAME_MODE.ENTER_NAME:
             self.active_menu.blit()
+        PerfHud.blit(self.level)
         Display.update(padding_color = SCREEN.PADDING_COLOR)
\ No newline at end of file
@@ -4,11 +4,13 @@ if TYPE_CHECKING:
     from src.templates import AlienTemplate
 
 import pygame
-from src.settings import SHIP, LEVEL_STATUS, SHIP_STATUS, PATH
+import struct
+import zlib
+from src.settings import SHIP, LEVEL_STATUS, SHIP_STATUS, PATH, PERFORMANCE
 from src.templates import ALIEN, BULLET
-from src.utils import Display, Sound, GraphicData, ActionTimer, Vector
-from src.sprite import Alien, Ship, Sprite, BOUNDARY
-from random import random
+from src.utils import Display, Sound, GraphicData, ActionTimer, Vector, Ball, SpatialHash, SpatialGroup, Perf, MemoryStats, ball_collision_data
+from src.sprite import Alien, Ship, Sprite, BOUNDARY, KinematicsEngine
+from random import Random
 
 class Level:
     """Manage game levels, loading enemies, timed events, collisions, and player progress.
@@ -17,33 +19,42 @@ class Level:
     goals: list[str] - Descriptions of objectives for each level.
     ship, crosshairs: Sprites for level objects
     bullets, asteroids, aliens, ufos, blobs, items, ship_bullets: Pygame sprite groups
+    kinematics: Optional numpy engine moving all level sprites in one vectorized step
+    spatial_hash: Broad phase index of bullets, asteroids, aliens, blobs and items for collision checks
     timer, asteroid_hail, alien_hail: Timers for level events.
-    boundary_behaviour: Default behaviour for enemies in current level."""
+    boundary_behaviour: Default behaviour for enemies in current level.
+    rng: Random number generator for all spawns, item drops and alarms in the level.
+    Seeding it makes simulations of the level reproducible."""
 
-    def __init__(self, number):
+    def __init__(self, number, seed: int | None = None):
         # Level settings
         self.number = number
+        self.rng = Random(seed)
         self.goals = ["Welcome!","Destroy all asteroids!","Defeat all aliens!","Defeat the ufo!","Defeat the blob!","Survive for a minute!"]
         self.max_level = len(self.goals) - 1
         self.boundary_behaviour = None
+        self.kinematics = KinematicsEngine.create() if PERFORMANCE.NUMPY_KINEMATICS else None
+        Sprite.kinematics = self.kinematics
 
         # Level sprites and sprite groups
         self.ship = Ship(self)
         self.crosshairs = Sprite(GraphicData(path = PATH.BULLET / "aim.png", scaling_width = BULLET.MISSILE.width))
+        self.spatial_hash = SpatialHash(Display.grid_width)
         self.ship_bullets = pygame.sprite.Group()
-        self.bullets = pygame.sprite.Group()
-        self.items = pygame.sprite.Group()
-        self.asteroids = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        self.bullets = SpatialGroup(self.spatial_hash)
+        self.items = SpatialGroup(self.spatial_hash)
+        self.asteroids = SpatialGroup(self.spatial_hash)
+        self.aliens = SpatialGroup(self.spatial_hash)
         self.ufos = pygame.sprite.Group()
-        self.blobs = pygame.sprite.Group()
+        self.blobs = SpatialGroup(self.spatial_hash)
 
         # Timers for level events
-        self.timer = ActionTimer()
-        self.asteroid_hail = ActionTimer()
-        self.alien_hail = ActionTimer()
+        self.timer = ActionTimer(rng = self.rng)
+        self.asteroid_hail = ActionTimer(rng = self.rng)
+        self.alien_hail = ActionTimer(rng = self.rng)
         self.timers = (self.timer, self.asteroid_hail, self.alien_hail)
         
+    @Perf.timed("Level.blit")
     def blit(self, screen: pygame.Surface | None = None):
         """Blit all level sprites onto the given screen."""
         screen = screen or Display.screen
@@ -53,6 +64,10 @@ class Level:
         self.ship.blit(screen)
         self.crosshairs.blit(screen)
 
+    def seed(self, seed: int | None):
+        """Reseed the level's random number generator (shared with all its sprites and timers)."""
+        self.rng.seed(seed)
+
     def start_current(self):
         """(Re)start current game level."""
         self.ship.reset_pos()
@@ -60,10 +75,13 @@ class Level:
             timer.pause()
         self.goal = self.goals[self.number]
 
+        for bullet in self.bullets.sprites():
+            bullet.kill() # return flying bullets to their pool
         for group in [self.ship_bullets, self.bullets, self.ufos,
                     self.asteroids, self.aliens, self.blobs]:
             group.empty()
         self.load_level(self.number)
+        MemoryStats.snapshot(f"level {self.number}")
 
     def start_next(self):
         """Start the next game level."""
@@ -75,7 +93,8 @@ class Level:
         """Restart from starting game level."""
         Sound.level_solved.play()
         self.number = SHIP.GAME_LEVEL
-        self.items.empty()
+        for item in self.items.sprites():
+            item.kill()
         self.ship.start_new_game()
         self.start_current()
 
@@ -98,11 +117,11 @@ class Level:
             """Triggers spawning of an alien at a random top position, aiming towards a random bottom position."""
             constraints = alien.constraints
             spawning_pos = Vector(
-                constraints.x + random() * (constraints.w - alien.w),
+                constraints.x + self.rng.random() * (constraints.w - alien.w),
                 constraints.y - alien.h
             )
             target_pos = Vector(
-                constraints.x + random() * (constraints.w - alien.w),
+                constraints.x + self.rng.random() * (constraints.w - alien.w),
                 constraints.bottom
             )
             alien.vel = alien.speed * (target_pos - spawning_pos).normalize
@@ -210,6 +229,18 @@ class Level:
             return LEVEL_STATUS.GAME_WON
         return LEVEL_STATUS.RUNNING
 
+    def checksum(self) -> int:
+        """CRC32 of the level's dynamic state, used to detect diverging replays.
+        Negative zeros count as zeros (adding 0.0), e.g. negating an integer zero velocity keeps its sign
+        while the kinematics engine stores it as float."""
+        ship = self.ship
+        values = [self.number, ship.lives, ship.energy, ship.score, ship.missiles, ship.pos.x, ship.pos.y]
+        for group in (self.bullets, self.asteroids, self.aliens, self.items):
+            values.append(len(group))
+            for sprite in group:
+                values += (sprite.pos.x, sprite.pos.y, sprite.vel.x, sprite.vel.y)
+        return zlib.crc32(struct.pack(f"<{len(values)}d", *(value + 0.0 for value in values)))
+
     def play_status_sound(self):
         """Play the appropriate sound when a level ends."""
         pygame.mixer.stop()
@@ -228,30 +259,83 @@ class Level:
         if self.asteroid_hail.check_alarm():
             self.encounter(ALIEN.BIG_ASTEROID, boundary_behaviour = BOUNDARY.VANISH)
         if self.alien_hail.check_alarm():
-            if random() > 0.5:
+            if self.rng.random() > 0.5:
                 self.encounter(ALIEN.PURPLE, boundary_behaviour = BOUNDARY.REFLECT)
             else:
                 self.encounter(ALIEN.BLOB, energy = ALIEN.BLOB.energy//4, boundary_behaviour = BOUNDARY.REFLECT)
         self.update_sprites(dt)
 
+    @Perf.timed("Level.update_sprites")
     def update_sprites(self, dt: int):
         """Update the status of all level objects."""
+        # The engine moves the sprites before they animate and act, like Sprite.update does.
+        # Sprites leaving their constraints kill themselves in their update (see Sprite.vanished).
+        vanished = ()
+        if self.kinematics is not None:
+            for item in self.items:
+                if item.engine is not None:
+                    item.steer()
+            vanished = self.kinematics.step(dt, self.spatial_hash.cell_size)
         for group in [self.bullets, self.asteroids, self.aliens, self.items]:
             for sprite in group:
                 sprite.update(dt)
         self.ship.update(dt)
+        for sprite in vanished:
+            if sprite.engine is self.kinematics and sprite.vanished == self.kinematics.steps: # not in the updated groups
+                sprite.kill()
+        self.asteroids_collide()
         self.update_crosshairs()
         self.collision_checks()
 
+    def asteroids_collide(self):
+        """Asteroids collide elastically like 3d balls.
+        Sweep and prune: asteroids get sorted along the x-axis, so each one
+        is only tested against those overlapping it horizontally, every pair once.
+        Their balls' centers and radii are cached, pairs whose balls don't intersect get rejected
+        with the same test as in ball_collision_data, the others get their Balls from the cache.
+        Colliding asteroids are rewound to their time of impact, change their velocities
+        and move forward again for the same amount of time."""
+        def ball_data(ast: Alien) -> list:
+            x, y, w = ast.pos.x, ast.pos.y, ast.w
+            return [ast, x, x + w / 2, y + ast.h / 2, w / 2] # sprite, left, center x and y, radius (like Sprite.ball)
+
+        active = []
+        for ast in sorted(self.asteroids, key=lambda ast: ast.pos.x):
+            data = ball_data(ast)
+            _, left, x, y, r = data
+            active = [entry for entry in active if entry[1] + 2 * entry[4] >= left]
+            for other_data in active:
+                dx, dy = other_data[2] - x, other_data[3] - y
+                if dx * dx + dy * dy >= (other_data[4] + r) ** 2:
+                    continue
+                other = other_data[0]
+                collision_time, new_v1, new_v2 = ball_collision_data(
+                    Ball(Vector(other_data[2], other_data[3]), other.vel, other_data[4]),
+                    Ball(Vector(x, y), ast.vel, r), other.mass, ast.mass)
+                if collision_time is None:
+                    continue
+                other.update_pos(collision_time)
+                ast.update_pos(collision_time)
+                other.vel, ast.vel = new_v1, new_v2
+                other.update_pos(-collision_time)
+                ast.update_pos(-collision_time)
+                other_data[:] = ball_data(other)
+                data[:] = ball_data(ast)
+                _, left, x, y, r = data
+            active.append(data)
+
     def update_crosshairs(self):
         """The crosshairs follow the player's mouse position."""
         x,y = pygame.mouse.get_pos()
         self.crosshairs.spawn(center=Vector(x - Display.padding_w, y - Display.padding_h))
 
+    @Perf.timed("Level.collision_checks")
     def collision_checks(self):
         """Check for collisions of level sprites:
         inflict damage; kill, split or merge enemies;
-        add points to the player's score; generate items."""
+        add points to the player's score; generate items.
+        Candidates for collisions are looked up in the level's spatial hash,
+        only sprites in neighbouring cells are tested with their masks."""
         self.bullets_hit()
         self.enemies_hit_ship()
         self.ship_collects_item()
@@ -260,8 +344,7 @@ class Level:
     def bullets_hit(self):
         """Check if bullets hit enemies or the ship"""
         # Bullets hitting asteroids
-        collisions = pygame.sprite.groupcollide(
-            self.bullets, self.asteroids, False, False, collided=pygame.sprite.collide_mask)
+        collisions = {bullet: hits for bullet in self.bullets if (hits := self.asteroids.collide(bullet))}
         for bullet in collisions.keys():
             for asteroid in collisions[bullet]:
                 if bullet.template.name != "explosion":
@@ -273,89 +356,82 @@ class Level:
                     asteroid.get_damage(bullet.damage)
                     asteroid.kill()
 
-        # Player's bullets hitting aliens or enemies' bullets hitting the ship
-        for bullet in self.bullets:
-            if bullet.owner == "player":
-                for alien in self.aliens:
-                    if pygame.sprite.collide_mask(bullet, alien):
-                        if bullet.template.name != "explosion":
-                            alien.get_damage(bullet.damage)
-                            bullet.kill()
-                        if bullet.template.name == "explosion" and alien not in bullet.hit_enemies:
-                            # missiles hit each enemy at most once during their explosion time
-                            if alien.template.name == "blob":
-                                if alien.energy == 1:
-                                    alien.kill()
-                                else:
-                                    Sound.slime_hit.play()
-                                    alien.energy = alien.energy//2
-                                    alien.update_blob_image()
-                            else:
-                                alien.get_damage(bullet.damage)
-                            bullet.hit_enemies.add(alien)
-            elif bullet.owner == "enemy" and pygame.sprite.collide_mask(bullet, self.ship):
-                if self.ship.status == SHIP_STATUS.SHIELD:
-                    if bullet.vel * (self.ship.pos - bullet.pos) > 0:
-                        bullet.reflect()
-                        bullet.owner = "player"
-                else:
-                    self.ship.get_damage(bullet.damage)
+        # Player's bullets hitting aliens
+        for bullet in [bullet for bullet in self.bullets if bullet.owner == "player"]:
+            for alien in self.aliens.collide(bullet):
+                if bullet.template.name != "explosion":
+                    alien.get_damage(bullet.damage)
                     bullet.kill()
-                    Sound.player_hit.play()
+                if bullet.template.name == "explosion" and alien not in bullet.hit_enemies:
+                    # missiles hit each enemy at most once during their explosion time
+                    if alien.template.name == "blob":
+                        if alien.energy == 1:
+                            alien.kill()
+                        else:
+                            Sound.slime_hit.play()
+                            alien.energy = alien.energy//2
+                            alien.update_blob_image()
+                    else:
+                        alien.get_damage(bullet.damage)
+                    bullet.hit_enemies.add(alien)
+
+        # Enemies' bullets hitting the ship
+        for bullet in self.bullets.collide(self.ship):
+            if bullet.owner != "enemy":
+                continue
+            if self.ship.status == SHIP_STATUS.SHIELD:
+                if bullet.vel * (self.ship.pos - bullet.pos) > 0:
+                    bullet.reflect()
+                    bullet.owner = "player"
+            else:
+                self.ship.get_damage(bullet.damage)
+                bullet.kill()
+                Sound.player_hit.play()
             
     def enemies_hit_ship(self):
         """If enemies hit the ship, reflect with shield or inflict damage and kill the enemy."""
-        for asteroid in self.asteroids:
-            if pygame.sprite.collide_mask(self.ship, asteroid):
-                if self.ship.status == SHIP_STATUS.SHIELD or self.status == LEVEL_STATUS.START:
-                    if asteroid.vel * (self.ship.pos - asteroid.pos) > 0:
-                        asteroid.reflect()
-                else:
-                    self.ship.get_damage(asteroid.energy)
-                    asteroid.energy = 0
-                    asteroid.kill()
-        for alien in self.aliens:
-            if pygame.sprite.collide_mask(self.ship, alien):
-                if self.ship.status == SHIP_STATUS.SHIELD or self.status == LEVEL_STATUS.START:
-                    if alien.vel * (self.ship.pos - alien.pos) > 0:
-                        alien.reflect()
+        for asteroid in self.asteroids.collide(self.ship):
+            if self.ship.status == SHIP_STATUS.SHIELD or self.status == LEVEL_STATUS.START:
+                if asteroid.vel * (self.ship.pos - asteroid.pos) > 0:
+                    asteroid.reflect()
+            else:
+                self.ship.get_damage(asteroid.energy)
+                asteroid.energy = 0
+                asteroid.kill()
+        for alien in self.aliens.collide(self.ship):
+            if self.ship.status == SHIP_STATUS.SHIELD or self.status == LEVEL_STATUS.START:
+                if alien.vel * (self.ship.pos - alien.pos) > 0:
+                    alien.reflect()
+            else:
+                if self.ship.energy > alien.energy:
+                    self.ship.get_damage(alien.energy)
+                    alien.energy = 0
+                    alien.kill()
                 else:
-                    if self.ship.energy > alien.energy:
-                        self.ship.get_damage(alien.energy)
-                        alien.energy = 0
-                        alien.kill()
-                    else:
-                        self.ship.get_damage(alien.energy)
+                    self.ship.get_damage(alien.energy)
         
     def ship_collects_item(self):
         """If the ship collects an item, trigger its effect."""
-        for item in self.items:
-            if pygame.sprite.collide_mask(self.ship, item):
-                if self.ship.status == SHIP_STATUS.SHIELD:
-                    item.vel *= -1
-                else:
-                    self.ship.collect_item(item)
-                    item.kill()
+        for item in self.items.collide(self.ship):
+            if self.ship.status == SHIP_STATUS.SHIELD:
+                item.vel *= -1
+            else:
+                self.ship.collect_item(item)
+                item.kill()
 
     def blobs_collide(self):
         """Merge colliding blobs (if not too big) preserving total impuls and mass."""
-        merge_occured = False
         for blob1 in self.blobs:
-                if merge_occured:
-                    break
-                for blob2 in self.blobs:
-                    if(
-                        blob2 is not blob1
-                        and blob1.energy + blob2.energy <= ALIEN.BLOB.energy
-                        and pygame.sprite.collide_mask(blob1, blob2)
-                    ):
-                        dpdv = (blob1.center - blob2.center) * (blob1.vel - blob2.vel)
-                        if dpdv < 0:
-                            merge_occured = True            
-                            merged_blob = Alien.merge(blob1, blob2)
-                            self.aliens.add(merged_blob)
-                            self.blobs.add(merged_blob)
-                            blob1.hard_kill()
-                            blob2.hard_kill()
-                            Sound.blob_merge.play()
-                            break
\ No newline at end of file
+            for blob2 in self.blobs.collide(blob1):
+                if blob1.energy + blob2.energy > ALIEN.BLOB.energy:
+                    continue
+                dpdv = (blob1.center - blob2.center) * (blob1.vel - blob2.vel)
+                if dpdv < 0:
+                    merged_blob = Alien.merge(blob1, blob2)
+                    self.aliens.add(merged_blob)
+                    self.blobs.add(merged_blob)
+                    blob1.hard_kill()
+                    blob2.hard_kill()
+                    Sound.blob_merge.play()
+                    # at most one merge per frame
+                    return
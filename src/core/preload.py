@@ -0,0 +1,97 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+import pygame
+from src.sprite import Ship
+from src.utils import Display, Image, FrameSet, ImageArchive
+from src.settings import PATH, SCREEN, SHIP, PERFORMANCE
+from src.templates import ALIEN, BULLET, ITEM, AlienTemplate, BulletTemplate
+
+class Preloader:
+    """Decode, crop and rescale the sprite images on a thread pool before the main loop starts,
+    so the first spawn of a sprite type doesn't preprocess its images in the middle of a frame.
+    The image files below PATH.IMAGES get loaded with the parameters of the sprites requesting them,
+    images not used by sprites (e.g. the statusbar's, loaded directly by pygame) are skipped.
+    Decoding, scaling and saving PNGs releases the GIL, so the threads overlap their image work."""
+
+    @staticmethod
+    def specs() -> dict[Path, dict]:
+        """Loading parameters of the sprites' images, keyed by the path requested by the sprites."""
+        specs = {}
+        for template in vars(ALIEN).values():
+            if isinstance(template, AlienTemplate):
+                specs[PATH.ALIEN / template.name] = {"colorkey": template.colorkey, "scaling_width": template.width}
+        for template in vars(BULLET).values():
+            if isinstance(template, BulletTemplate):
+                specs[PATH.BULLET / template.name] = {"scaling_width": template.width}
+        specs[PATH.BULLET / "aim.png"] = {"scaling_width": BULLET.MISSILE.width}
+        for template in ITEM.LIST:
+            specs[PATH.ITEM / template.name] = {"scaling_width": template.size}
+        for rank in SHIP.WIDTH:
+            for letter in Ship.LETTERS.values():
+                specs[PATH.SHIP / f"{letter}-{rank}.png"] = {"scaling_width": SHIP.WIDTH[rank]}
+        return specs
+
+    @staticmethod
+    def jobs(specs: dict[Path, dict]) -> list[tuple[Path, Path, dict]]:
+        """Walk PATH.IMAGES and match each file with the requested path (the file itself,
+        the file without suffix or its animation directory) and its loading parameters."""
+        jobs = []
+        for file in sorted(PATH.IMAGES.rglob("*.png")):
+            for requested in (file, file.with_suffix(""), file.parent):
+                if requested in specs:
+                    jobs.append((file, requested, specs[requested]))
+                    break
+        return jobs
+
+    @classmethod
+    def run(cls, progress: Callable[[int, int], None] | None = None,
+                threads: int = PERFORMANCE.PRELOAD_THREADS,
+                pack: bool = True) -> int:
+        """Fill Image.cache with all sprite images and FrameSet.cache with their frame sets.
+        progress: called in the calling thread with the number of loaded and of all images.
+        pack: (re)write the resolution's image archive if images are missing or outdated in it.
+        Returns the number of loaded images."""
+        jobs = cls.jobs(cls.specs())
+        with ThreadPoolExecutor(max_workers = threads, thread_name_prefix = "Preloader") as executor:
+            futures = [executor.submit(Image.load, str(file), **params) for file, _, params in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress is not None:
+                    progress(done, len(futures))
+        # The frame sets only collect the cached images
+        for requested, params in {requested: params for _, requested, params in jobs}.items():
+            FrameSet.load(requested, **params)
+        manifest = Image.manifest()
+        relpaths = [file.relative_to(PATH.IMAGES).as_posix() for file, _, _ in jobs]
+        if pack and (ImageArchive.current() is None or not all(manifest.is_packed(relpath) for relpath in relpaths)):
+            Image.pack()
+        return len(jobs)
+
+    @classmethod
+    def prebake(cls, grid_widths: list[int], processes: int | None = None,
+                progress: Callable[[int, int, float], None] | None = None):
+        """Preprocess and pack the sprite images for several resolutions on a process pool,
+        one grid width per task, to ship the preprocessed images with the game.
+        progress: called with the grid width, number of images and seconds once a resolution is done."""
+        context = mp.get_context("spawn")
+        # The image caches belong to one resolution, so each grid width gets a fresh process.
+        with ProcessPoolExecutor(max_workers = processes, mp_context = context, max_tasks_per_child = 1) as executor:
+            futures = [executor.submit(_prebake, grid_width) for grid_width in dict.fromkeys(grid_widths)]
+            for future in as_completed(futures):
+                result = future.result()
+                if progress is not None:
+                    progress(*result)
+
+def _prebake(grid_width: int) -> tuple[int, int, float]:
+    """Preprocess and pack all sprite images for one grid width in a worker process."""
+    start = perf_counter()
+    pygame.init()
+    grid_w, grid_h = SCREEN.GRID
+    Display.init(SCREEN.SIZE, SCREEN.GRID, headless = True, window_size = (grid_width * grid_w, grid_width * grid_h))
+    count = Preloader.run()
+    pygame.quit() # saves the remaining images and the manifest
+    return grid_width, count, perf_counter() - start
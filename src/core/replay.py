@@ -0,0 +1,148 @@
+from __future__ import annotations
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from .level import Level
+from src.settings import SCREEN, REPLAY
+from src.utils import Vector
+
+# Binary replay format (little endian), written append-only while playing:
+# header: magic "SSRP", version, seed, window width and height, screen grid, starting level
+# frame:  flags byte
+#         [event count, events...]    if flags & HAS_EVENTS
+#         [dt (ms), level checksum]   if flags & UPDATED, dt unsigned 32 bit as frames can take minutes (debugger, suspend)
+# event:  type byte [x, y of the missile click if type == MISSILE]
+HEADER = struct.Struct("<4sBIHHBBB")
+MAGIC, VERSION = b"SSRP", 2
+BYTE = struct.Struct("<B")
+POS = struct.Struct("<hh")
+UPDATE = struct.Struct("<II")
+
+class KeyState(dict):
+    """Recorded key states, indexable like pygame.key.get_pressed()."""
+    def __missing__(self, key: int) -> bool:
+        return False
+
+class InputRecorder:
+    """Record the input a game level consumes on each frame into a replay file."""
+
+    def __init__(self, path: str | Path, seed: int, window_size: tuple[int, int], level_number: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents = True, exist_ok = True)
+        self.file = open(self.path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, *window_size, *SCREEN.GRID, level_number))
+        self.flags = 0
+        self.events = []
+
+    def event(self, event_type: int, pos: Vector | None = None):
+        """Record a level-affecting event of the current frame (REPLAY.SHOOT, REPLAY.MISSILE, ...)."""
+        data = BYTE.pack(event_type)
+        if event_type == REPLAY.MISSILE:
+            data += POS.pack(int(pos.x), int(pos.y))
+        self.events.append(data)
+
+    def keys(self, keys):
+        """Record the key states the ship is controlled with on the current frame."""
+        self.flags |= REPLAY.CONTROLLED
+        for bit, key in enumerate(REPLAY.KEYS):
+            if keys[key]:
+                self.flags |= 1 << bit
+
+    def end_frame(self, level: Level, dt: int | None):
+        """Append the current frame. dt is None if the level wasn't updated."""
+        flags = self.flags
+        if self.events:
+            flags |= REPLAY.HAS_EVENTS
+        if dt is not None:
+            flags |= REPLAY.UPDATED
+        if flags:
+            data = BYTE.pack(flags)
+            if self.events:
+                data += BYTE.pack(len(self.events)) + b"".join(self.events)
+            if dt is not None:
+                data += UPDATE.pack(dt, level.checksum())
+            self.file.write(data)
+        self.flags, self.events = 0, []
+
+    def close(self):
+        self.file.close()
+
+@dataclass
+class ReplayFrame:
+    keys: KeyState | None # None if the ship wasn't controlled
+    events: list[tuple]
+    dt: int | None # None if the level wasn't updated
+    checksum: int | None
+
+@dataclass
+class ReplayResult:
+    frames: int
+    fps: float
+    divergent_frame: int | None = None # index of the first frame with a different checksum
+
+class ReplayPlayer:
+    """Load a recorded replay and feed it back into a level at full speed.
+    Requires an initialized display of the recorded window size (see Simulation.init)."""
+
+    def __init__(self, path: str | Path):
+        data = Path(path).read_bytes()
+        magic, version, self.seed, w, h, gx, gy, self.level_number = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a replay file of version {VERSION}.")
+        self.window_size, self.grid = (w, h), (gx, gy)
+        self.frames = self.parse_frames(data, HEADER.size)
+        self.level: Level | None = None # level of the current or last play
+
+    @classmethod
+    def parse_frames(cls, data: bytes, offset: int) -> list[ReplayFrame]:
+        """Parse all complete frames, a truncated last frame (e.g. after a crash) gets ignored."""
+        frames = []
+        try:
+            while offset < len(data):
+                flags, = BYTE.unpack_from(data, offset)
+                offset += 1
+                keys, events, dt, checksum = None, [], None, None
+                if flags & REPLAY.CONTROLLED:
+                    keys = KeyState({key: bool(flags & 1 << bit) for bit, key in enumerate(REPLAY.KEYS)})
+                if flags & REPLAY.HAS_EVENTS:
+                    count, = BYTE.unpack_from(data, offset)
+                    offset += 1
+                    for _ in range(count):
+                        event_type, = BYTE.unpack_from(data, offset)
+                        offset += 1
+                        if event_type == REPLAY.MISSILE:
+                            events.append((event_type, *POS.unpack_from(data, offset)))
+                            offset += POS.size
+                        else:
+                            events.append((event_type,))
+                if flags & REPLAY.UPDATED:
+                    dt, checksum = UPDATE.unpack_from(data, offset)
+                    offset += UPDATE.size
+                frames.append(ReplayFrame(keys, events, dt, checksum))
+        except struct.error:
+            pass
+        return frames
+
+    def play(self, verify: bool = True) -> ReplayResult:
+        """Replay all frames on a fresh level. If verify is True,
+        compare the level's checksums with the recorded ones."""
+        level = self.level = Level(self.level_number, seed = self.seed)
+        level.start_current()
+        divergent_frame = None
+        start = perf_counter()
+        for index, frame in enumerate(self.frames):
+            for event in frame.events:
+                match event[0]:
+                    case REPLAY.SHOOT: level.ship.shoot_bullets()
+                    case REPLAY.MISSILE: level.ship.shoot_missile(Vector(event[1], event[2]))
+                    case REPLAY.RESTART_GAME: level.restart_game()
+                    case REPLAY.START_NEXT: level.start_next()
+            if frame.keys is not None:
+                level.ship.control(frame.keys)
+            if frame.dt is not None:
+                level.update(frame.dt)
+                if verify and divergent_frame is None and level.checksum() != frame.checksum:
+                    divergent_frame = index
+        elapsed = perf_counter() - start
+        return ReplayResult(len(self.frames), len(self.frames) / elapsed if elapsed > 0 else float("inf"), divergent_frame)
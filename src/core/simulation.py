@@ -0,0 +1,97 @@
+from __future__ import annotations
+import os
+import pygame
+from .level import Level
+from src.settings import KEY, SCREEN, LEVEL_STATUS
+from src.utils import Vector, Sound, Display
+from src.gui import Statusbar
+from random import Random
+from time import perf_counter
+
+class SyntheticInput:
+    """Imitates a player: steers the ship in random directions,
+    shoots bullets and missiles and occasionally raises the shield.
+    Provides the key states like pygame.key.get_pressed()."""
+
+    def __init__(self, rng: Random | None = None):
+        self.rng = rng or Random()
+        self.keys = {KEY.LEFT: False, KEY.RIGHT: False, KEY.UP: False, KEY.DOWN: False, KEY.SHIELD: False}
+        self.frames_until_change = 0
+
+    def __getitem__(self, key: int) -> bool:
+        return self.keys.get(key, False)
+
+    def apply(self, level: Level):
+        """Feed the input of the current frame into the level's ship."""
+        if self.frames_until_change <= 0:
+            # Keep a direction for a random number of frames
+            self.frames_until_change = self.rng.randint(10, 60)
+            for key in (KEY.LEFT, KEY.RIGHT, KEY.UP, KEY.DOWN):
+                self.keys[key] = self.rng.random() < 0.3
+            self.keys[KEY.SHIELD] = self.rng.random() < 0.05
+        self.frames_until_change -= 1
+        if self.rng.random() < 0.1:
+            level.ship.shoot_bullets()
+        if self.rng.random() < 0.002:
+            level.ship.shoot_missile(Vector(self.rng.random() * Display.screen_width,
+                                            self.rng.random() * Display.screen_height))
+        level.ship.control(self)
+
+class Simulation:
+    """Run a game level without display output or sound at maximum speed.
+    Used for soak tests and profiling on machines without a display.
+
+    level: Level - Simulated level, restarted whenever it ends.
+    render: bool - Also blit the level and status bar onto the (invisible) screen.
+    dt: int - Simulated milliseconds per frame.
+    seed: int - Seeds the level and the synthetic input, equal seeds give identical simulations."""
+
+    @classmethod
+    def init(cls, window_size: tuple[int, int] | None = None):
+        """Initialize pygame on the SDL dummy drivers with muted sounds.
+        The window size (default: SCREEN.SIZE) determines the sizes of all sprites."""
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.init()
+        Display.init(SCREEN.SIZE, SCREEN.GRID, headless = True, window_size = window_size)
+        Sound.init(mute = True)
+
+    def __init__(self, level_number: int = 1, render: bool = False, dt: int = 16, seed: int | None = None):
+        self.level = Level(level_number, seed = seed)
+        self.render = render
+        self.dt = dt
+        self.input = SyntheticInput(Random(seed))
+        self.frames = 0
+        self.restarts = 0
+        self.level.start_current()
+
+    def step(self):
+        """Simulate a single frame."""
+        self.input.apply(self.level)
+        self.level.update(self.dt)
+        if self.level.status not in (LEVEL_STATUS.RUNNING, LEVEL_STATUS.START):
+            self.restart()
+        if self.render:
+            Display.screen.fill(SCREEN.BG_COLOR)
+            Statusbar.blit(self.level)
+            self.level.blit()
+        self.frames += 1
+
+    def restart(self):
+        """Replay the same level after it was solved or the game got lost."""
+        self.restarts += 1
+        if self.level.status == LEVEL_STATUS.GAME_OVER:
+            self.level.ship.start_new_game()
+        self.level.start_current()
+
+    def run(self, frames: int) -> float:
+        """Simulate the given number of frames, return the simulated frames per second."""
+        start = perf_counter()
+        for _ in range(frames):
+            self.step()
+        elapsed = perf_counter() - start
+        return frames / elapsed if elapsed > 0 else float("inf")
+
+    def report(self, fps: float) -> str:
+        return (f"Level {self.level.number}: {self.frames} frames simulated at {fps:.0f} fps "
+                f"({fps * self.dt / 1000:.1f}x real time), {self.restarts} restarts")
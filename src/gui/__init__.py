@@ -1,7 +1,8 @@
 from .menu import Menu
 from .statusbar import Statusbar
 from .text import Layout, Text
+from .perfhud import PerfHud
 
 __all__ = [
-    Menu, Statusbar, Layout, Text
+    Menu, Statusbar, Layout, Text, PerfHud
 ]
\ No newline at end of file
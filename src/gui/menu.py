@@ -5,8 +5,8 @@ if TYPE_CHECKING:
 
 import pygame
 from .text import Layout, Text
-from src.utils import Display, Sound
-from src.settings import COLOR, KEY, SCREEN, FONT, MENU, LEVEL_STATUS, GAME_MODE, HIGHSCORES, PATH
+from src.utils import Display, Sound, Perf
+from src.settings import COLOR, KEY, SCREEN, FONT, MENU, LEVEL_STATUS, GAME_MODE, HIGHSCORES, PATH, REPLAY
 from src.templates import ITEM
 
 class Menu():
@@ -68,6 +68,7 @@ class Menu():
                     current_selection: int = 0, highscores: Highscores | None = None) -> Menu:
         """Creates a menu from a given title message and options,
         allows for showing high sores in between"""
+        Perf.event("Menu.create")
         if highscores is not None:
             message += [""]
         text = Text(message, Menu.text_font, COLOR.WHITE, COLOR.BLUE)
@@ -151,7 +152,8 @@ class Menu():
                                 "SPACE: shoot bullets",
                                 "LEFT SHIFT: activate shield",
                                 "Left click: drop missile",
-                                "RETURN: pause the game","Escape: end the game"],
+                                "RETURN: pause the game","Escape: end the game",
+                                "F3: performance overlay"],
                                 options = ["Item list", "Go back"])
         cls.ITEM_LIST1 = Menu.create(["Item list",
                                 [pygame.image.load(PATH.ITEM / "bullets_buff.png"), " upgrades your bullets"],
@@ -193,6 +195,7 @@ class Menu():
             # Menu options that start or exit the game
             case "Restart" | "Start game" | "New game":
                 game.mode = GAME_MODE.GAME
+                game.record(REPLAY.RESTART_GAME)
                 game.level.restart_game()
             case "Continue":
                 game.mode = GAME_MODE.GAME
@@ -200,6 +203,7 @@ class Menu():
                 game.mode = GAME_MODE.EXIT
             case "Next level":
                 game.mode = GAME_MODE.GAME
+                game.record(REPLAY.START_NEXT)
                 game.level.start_next()
 
             # Menu options to browse the main menu
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from src.core import Level
+
+import pygame
+from src.utils import Display, Perf, MemoryStats
+from src.sprite import SpritePool
+from src.settings import COLOR, FONT
+
+class PerfHud:
+    """Toggleable overlay with rolling frame time graphs of the game loop's phases,
+    sprite counts per group, the memory used by images, the reuse of pooled sprites
+    and the last hitches (frames over budget) with their causes."""
+    COLORS = {"handle_user_input": COLOR.LIGHT_GREY, "Level.update_sprites": COLOR.GREEN,
+              "Level.collision_checks": COLOR.RED, "Level.blit": COLOR.BLUE,
+              "Statusbar.blit": COLOR.YELLOW, "Display.update": (255, 128, 0), "total": COLOR.WHITE}
+    GROUPS = ("bullets", "ship_bullets", "asteroids", "aliens", "ufos", "blobs", "items")
+    MEMORY_INTERVAL = 30 # frames between updates of the memory summary
+    initialized = False
+    memory = ""
+    pools = ""
+
+    @classmethod
+    def init(cls):
+        """Initialize the font and graph sizes once."""
+        if cls.initialized:
+            return
+        cls.font_size = max(Display.grid_width // 6, 8)
+        cls.font = pygame.font.Font(FONT.TEXT, cls.font_size)
+        cls.line_height = cls.font_size * 5 // 4
+        cls.graph_w, cls.graph_h = 2 * Perf.HISTORY, 2 * Display.grid_width
+        cls.initialized = True
+
+    @classmethod
+    def toggle(cls):
+        """Show or hide the overlay, phases are only measured while it's shown (hitches are always logged)."""
+        Perf.enable(not Perf.enabled)
+
+    @classmethod
+    def blit(cls, level: Level, screen: pygame.Surface | None = None):
+        """Blit the overlay onto the bottom left corner of the screen."""
+        if not Perf.enabled:
+            return
+        screen = screen or Display.screen
+        if not cls.initialized:
+            cls.init()
+        lines = [(f"{phase} {values[-1]:5.1f} ms (avg {sum(values) / len(values):5.1f})", cls.COLORS[phase])
+                 for phase, values in Perf.history.items() if values]
+        lines.append((" ".join(f"{name} {len(getattr(level, name))}" for name in cls.GROUPS), COLOR.WHITE))
+        if not cls.memory or Perf.frame_count % cls.MEMORY_INTERVAL == 0:
+            cls.memory = MemoryStats.summary()
+            cls.pools = SpritePool.summary()
+        lines.append((cls.memory, COLOR.WHITE))
+        lines.append((cls.pools, COLOR.WHITE))
+        for total, phases, causes in list(Perf.hitches)[-3:]:
+            # Hitches before the overlay was shown have no phase breakdown
+            worst = f", {max(phases, key=phases.get)} {max(phases.values()):.1f} ms" if phases else ""
+            lines.append((f"hitch {total:.1f} ms{worst}: "
+                          f"{', '.join(dict.fromkeys(causes)) or 'unknown'}", COLOR.RED))
+        texts = [cls.font.render(text, False, color) for text, color in lines]
+        width = max(cls.graph_w, *(text.get_width() for text in texts)) + 2 * cls.font_size
+        height = cls.graph_h + len(texts) * cls.line_height + 3 * cls.font_size // 2
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+
+        # Graphs span twice the frame budget, the dark line marks the budget
+        x0, y0 = cls.font_size, cls.font_size // 2
+        scale = cls.graph_h / (2 * Perf.budget)
+        pygame.draw.line(panel, COLOR.GREY, (x0, y0 + cls.graph_h // 2), (x0 + cls.graph_w, y0 + cls.graph_h // 2))
+        for phase, values in Perf.history.items():
+            if len(values) < 2:
+                continue
+            points = [(x0 + 2 * i, y0 + cls.graph_h - min(ms * scale, cls.graph_h)) for i, ms in enumerate(values)]
+            pygame.draw.lines(panel, cls.COLORS[phase], False, points)
+        y = y0 + cls.graph_h + cls.font_size // 2
+        for text in texts:
+            panel.blit(text, (x0, y))
+            y += cls.line_height
+        screen.blit(panel, (0, Display.screen_height - height))
@@ -5,7 +5,7 @@ if TYPE_CHECKING:
     
 import pygame
 from .text import Layout
-from src.utils import Display
+from src.utils import Display, Perf
 from src.settings import COLOR, SHIP, FONT, PATH
 
 class Statusbar:
@@ -36,8 +36,10 @@ class Statusbar:
         cls.score_font_size = cls.font_size//2
         cls.score_font = pygame.font.Font(FONT.STATS, cls.score_font_size)
         cls.score_padding = (cls.h//2-cls.score_font_size)//2                
+        cls.initialized = True
 
     @classmethod
+    @Perf.timed("Statusbar.blit")
     def blit(cls, level: Level, screen: pygame.Surface | None = None, rescaling: bool = True):
         """Blits the rendered status bar on the top of the screen.
         If rescaling is True, the status bar will be stretched to the user's screen width"""
@@ -27,6 +27,7 @@ class KEY:
     SHIELD = pygame.K_LSHIFT
     START = pygame.K_RETURN
     BACK = pygame.K_BACKSPACE
+    PERF_HUD = pygame.K_F3
 
 class SCREEN:
     """
@@ -40,6 +41,15 @@ class SCREEN:
     GRID = (16, 9)
     GRID_WIDTH = WIDTH // GRID[0] # 1600 / 16 = 100
 
+class PERFORMANCE:
+    """Optional engines and tuning parameters for large numbers of sprites"""
+    NUMPY_KINEMATICS = False # integrate the movement of all sprites vectorized with numpy
+    FRAME_BUDGET = 1000 / 60 # ms per frame, longer frames get logged as hitches
+    HITCH_LOG_SIZE = 2**20 # bytes, a larger hitch log gets rotated into hitches.log.1
+    PRELOAD_THREADS = 4 # threads decoding and preprocessing the sprite images before the game starts
+    IMAGE_WRITE_QUEUE = 64 # preprocessed images waiting to be saved to the disk cache in the background
+    IMAGE_CACHE_BUDGET = 64 * 2**20 # bytes of pixels and masks of all cached images, least recently used ones get evicted (None: no limit)
+
 class GAME_MODE:
     """Possible modes of the game to respond to user's input"""
     GAME = "game" # game is running normally
@@ -47,6 +57,17 @@ class GAME_MODE:
     ENTER_NAME = "enter name" # entering name into high score table"
     EXIT = "exit" # game exited by the player
 
+class REPLAY:
+    """Flags and event types of frames in replay files (recorded in replay.py)"""
+    KEYS = (KEY.LEFT, KEY.RIGHT, KEY.UP, KEY.DOWN, KEY.SHIELD) # bits 0-4 of the flags
+    CONTROLLED = 1 << 5 # ship was controlled by the key states
+    UPDATED = 1 << 6 # level was updated for dt ms
+    HAS_EVENTS = 1 << 7 # frame contains events
+    SHOOT = 1 # bullets were shot
+    MISSILE = 2 # missile was dropped at a position
+    RESTART_GAME = 3 # new game was started in the menu
+    START_NEXT = 4 # next level was started in the menu
+
 class LEVEL_STATUS:
     """Possible status properties of the running game level to coordinate the player's progress"""
     START = "start" # starting screen (level 0) is active, game.py opens main menu
@@ -83,6 +104,9 @@ class PATH:
     BASE = Path(__file__).resolve().parent.parent
     DATA = BASE / "data"
     PREPROCESSED = DATA / "preprocessed_images"
+    HITCH_LOG = DATA / "hitches.log"
+    PROFILE = DATA / "profile.collapsed"
+    MEMORY_REPORT = DATA / "memory.json"
     MEDIA = BASE / "media"
     SOUNDS = MEDIA / "sounds"
     FONTS = MEDIA / "fonts"
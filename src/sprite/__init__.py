@@ -3,7 +3,9 @@ from .bullet import Bullet
 from .item import Item
 from .ship import Ship
 from .sprite import Sprite, BOUNDARY
+from .kinematics import KinematicsEngine
+from .pool import SpritePool
 
 __all__ = [
-    Alien, Bullet, Item, Ship, Sprite, BOUNDARY
+    Alien, Bullet, Item, Ship, Sprite, BOUNDARY, KinematicsEngine, SpritePool
 ]
\ No newline at end of file
@@ -8,10 +8,9 @@ import pygame
 from .sprite import Sprite, BOUNDARY
 from .bullet import Bullet
 from .item import Item
-from src.utils import Display, Sound, GraphicData, ActionTimer, Vector, inelastic_collision, ball_collision_data
+from src.utils import Display, Sound, Image, GraphicData, ActionTimer, Vector, ZERO, Perf, inelastic_collision
 from src.settings import LEVEL_STATUS, PATH
 from src.templates import ALIEN, BULLET, ITEM 
-from random import random, choice, sample
 from math import pi
 
 class Alien(Sprite):
@@ -24,7 +23,7 @@ class Alien(Sprite):
                 direction: Vector | None = None,
                 pos: Vector | None = None,
                 vel: Vector | None = None,
-                acc: Vector = Vector(0, 0),
+                acc: Vector = ZERO,
                 constraints: pygame.Rect | None = None,
                 boundary_behaviour: str | None = BOUNDARY.REFLECT):
         """energy, speed: allow for overwriting their default settings for given template."""       
@@ -33,22 +32,22 @@ class Alien(Sprite):
         self.energy = energy or template.energy
         speed = speed or template.speed
         if vel is None:
-            direction = direction or Vector.random_direction()
+            direction = direction or Vector.random_direction(rng = level.rng)
             vel = speed * direction
         constraints = constraints or Display.screen_rect
-        self.action_timer = ActionTimer(template.alarm_min, template.alarm_max, cyclic = True)
+        self.action_timer = ActionTimer(template.alarm_min, template.alarm_max, cyclic = True, rng = level.rng)
 
         # Load alien graphics
         graphic = GraphicData(path = PATH.ALIEN / f"{template.name}", scaling_width = template.width, colorkey = template.colorkey,
                     animation_type = template.animation_type, fps = template.fps)
         super().__init__(graphic = graphic, pos = pos, vel = vel, acc = acc,
-                    constraints = constraints, boundary_behaviour = boundary_behaviour)
+                    constraints = constraints, boundary_behaviour = boundary_behaviour, rng = level.rng)
         if template.name == "blob":
             self.parent_center = None
             self.update_blob_image()
 
     def update_blob_image(self):
-        """A blob's image and size depend on its energy."""
+        """A blob's image and size depend on its energy, the scaled images are shared by all blobs."""
         if self.template.name != "blob":
             return
         if self.energy < ALIEN.BLOB.energy // 8:
@@ -58,7 +57,9 @@ class Alien(Sprite):
         else:
             self.frame_index = 0
         scaling_factor = (ALIEN.BLOB.energy / self.energy) ** (-1/3)
-        self.graphic.image = self.graphic.frames[self.frame_index].scale_by(scaling_factor)
+        self.graphic.image = Image.scaled(self.graphic.frame(self.frame_index), scaling_factor)
+        if self.engine is not None:
+            self.engine.resize(self) # pieces spawned by split get their image afterwards
 
     def spawn(self, **kwargs):
         """Place an initiated alien and play it's spawning sound"""
@@ -90,28 +91,15 @@ class Alien(Sprite):
         while self.level.status != LEVEL_STATUS.START and self.action_timer.check_alarm():
             self.do_action()
 
-        # Asteroids collide elastically like 3d balls.
+        # Collisions of asteroids are handled by Level.asteroids_collide.
         match self.template.name:
-            case "big_asteroid" | "small_asteroid":
-                for ast in self.level.asteroids:
-                    if ast is self:
-                        continue
-                    ball1, ball2, m1, m2 = self.ball, ast.ball, self.mass, ast.mass
-                    collision_time, new_v1, new_v2 = ball_collision_data(ball1, ball2, m1, m2)
-                    if collision_time is None:
-                        continue
-                    super().update_pos(collision_time)
-                    Sprite.update_pos(ast, collision_time)
-                    self.vel, ast.vel = new_v1, new_v2                  
-                    super().update_pos(-collision_time)
-                    Sprite.update_pos(ast, -collision_time)
             case "blob":
                 # Blobs gravitate towards their parent center where they split last.
                 if self.parent_center is None:
                     return
-                n = (self.parent_center - self.center).normalize
+                n = (self.parent_center - self.center).normalize_()
                 vr = self.vel * n
-                self.acc = - ALIEN.BLOB.acc * (vr - self.splitting_speed) * abs(vr + self.splitting_speed) * n            
+                self.acc = n.scale_(- ALIEN.BLOB.acc * (vr - self.splitting_speed) * abs(vr + self.splitting_speed))            
 
     def do_action(self):
         """Triggers an alien's specific action."""
@@ -122,7 +110,7 @@ class Alien(Sprite):
 
     # Templates of alien actions
     def shoot(self, bullet_template: BulletTemplate, size: int | None = None):
-        bullet = Bullet(bullet_template, size=size)
+        bullet = Bullet.create(bullet_template, size=size)
         bullet.spawn(center = self.midbottom)
         self.level.bullets.add(bullet)
         bullet.play_firing_sound()
@@ -146,15 +134,16 @@ class Alien(Sprite):
 
     def split(self, piece_template: AlienTemplate, amount: int) -> list[Alien]:
         """Splits an Alien preserving the total impuls. Used for asteroids and blobs."""
+        Perf.event(f"Alien.split {self.template.name}")
         if self.speed == 0:
-            w = Vector.random_direction()
+            w = Vector.random_direction(rng = self.level.rng)
         else:
             w = self.vel.normalize
         if piece_template.name == "blob":
             # Blobs split into smaller blobs with integer mass.
             m = self.mass // amount
             diff = self.mass - amount * m
-            masses = [m + 1 if i < diff else m for i in sample(range(amount), amount)]
+            masses = [m + 1 if i < diff else m for i in self.level.rng.sample(range(amount), amount)]
         pieces = []
         for i in range(amount):
             if piece_template.name == "blob":
@@ -188,8 +177,8 @@ class Alien(Sprite):
         if self.energy <= 0:
             {"big_asteroid": Sound.asteroid, "small_asteroid": Sound.small_asteroid, "purple": Sound.alienblob, "ufo":Sound.alienblob, "blob":Sound.alienblob}[self.template.name].play()
             self.level.ship.get_points(self.template.points)
-            if random() <= ITEM.PROBABILITY:
-                item = Item(choice(ITEM.LIST), self.level)
+            if self.level.rng.random() <= ITEM.PROBABILITY:
+                item = Item.create(self.level.rng.choice(ITEM.LIST), self.level)
                 item.spawn(center = self.center)
                 self.level.items.add(item)
         if self.template.name == "big_asteroid":
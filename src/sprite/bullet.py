@@ -5,20 +5,23 @@ if TYPE_CHECKING:
 
 import pygame
 from .sprite import Sprite, BOUNDARY
+from .pool import SpritePool
 from src.settings import PATH
 from src.templates import BULLET, ALIEN
-from src.utils import Display, Sound, GraphicData, Vector
+from src.utils import Display, Sound, Image, GraphicData, Vector, ZERO
 from math import ceil
 
 
 class Bullet(Sprite):
-    """Manage creation and properties of the player's and enemies' bullets."""
+    """Manage creation and properties of the player's and enemies' bullets.
+    Killed bullets return to the pool and get reused by Bullet.create."""
+    pool = SpritePool("bullet")
 
     def __init__(self, template: BulletTemplate,
                 speed: float | None = None,
                 pos: Vector | None = None,
                 vel: Vector | None = None,
-                acc: Vector = Vector(0, 0),
+                acc: Vector = ZERO,
                 owner: str | None = None,
                 damage: int | None = None,
                 size: int | None = None,
@@ -27,30 +30,63 @@ class Bullet(Sprite):
         """speed, owner, damage: allow for overwriting their default settings for given template.
         size: only used for blubber to determine the size of its sprite."""
         self.template = template
+        graphic = GraphicData(path = PATH.BULLET / f"{template.name}", scaling_width = template.width,
+                        animation_type = template.animation_type, animation_time = template.animation_time)
+        super().__init__(graphic = graphic)
+        self.reset(speed = speed, vel = vel, acc = acc, owner = owner, damage = damage, size = size,
+                   constraints = constraints, boundary_behaviour = boundary_behaviour)
+        if pos is not None:
+            self.spawn(pos = pos)
+
+    @classmethod
+    def create(cls, template: BulletTemplate, **kwargs) -> Bullet:
+        """Reuse a killed bullet of the given template from the pool or create a new one.
+        Takes the same keyword arguments as Bullet()."""
+        bullet = cls.pool.acquire(template.name)
+        if bullet is None:
+            return cls(template, **kwargs)
+        pos = kwargs.pop("pos", None)
+        bullet.reset(**kwargs)
+        if pos is not None:
+            bullet.spawn(pos = pos)
+        return bullet
+
+    def reset(self, speed: float | None = None,
+                vel: Vector | None = None,
+                acc: Vector = ZERO,
+                owner: str | None = None,
+                damage: int | None = None,
+                size: int | None = None,
+                constraints: pygame.Rect | None = None,
+                boundary_behaviour: str | None = BOUNDARY.VANISH):
+        """(Re)set the bullet's settings for its template, see Bullet()."""
+        template = self.template
         self.owner = owner or template.owner
         self.damage = damage or template.damage
         speed = speed if speed is not None else template.speed
         if vel is None:
             vel = Vector(0, -speed) if self.owner == "player" else Vector(0, speed)
-        constraints = constraints or Display.screen_rect
-        graphic = GraphicData(path = PATH.BULLET / f"{template.name}", scaling_width = template.width,
-                        animation_type = template.animation_type, animation_time = template.animation_time)
-        super().__init__(graphic = graphic, pos = pos, vel = vel, acc = acc,
-            constraints = constraints, boundary_behaviour = boundary_behaviour)
+        super().reset(vel = vel, acc = acc, constraints = constraints or Display.screen_rect,
+                      boundary_behaviour = boundary_behaviour)
         if template.name == "blubber":
             self.size = size or ALIEN.BLOB.energy
             scaling_factor = (ALIEN.BLOB.energy / self.size) ** (-1/3)
-            self.graphic.image = self.graphic.image.scale_by(scaling_factor)
+            self.graphic.image = Image.scaled(self.graphic.image, scaling_factor)
             self.damage = ceil((size / ALIEN.BLOB.energy) * template.damage)
-        if self.template.name == "explosion":
+        if template.name == "explosion":
             self.hit_enemies = pygame.sprite.Group()
-        
 
     @classmethod
     def from_size(cls, size: int, **kwargs) -> Bullet:
         """Creates a ship bullet of a given size 1, 2 or 3"""
         mapping = {1: BULLET.BULLET1, 2: BULLET.BULLET2, 3: BULLET.BULLET3}
-        return cls(mapping[size], **kwargs)
+        return cls.create(mapping[size], **kwargs)
+
+    def kill(self):
+        """Remove the bullet from all groups and return it to the pool."""
+        if self.alive():
+            super().kill()
+            self.pool.release(self.template.name, self)
 
     def play_firing_sound(self):
         match self.template.name:
@@ -6,29 +6,61 @@ if TYPE_CHECKING:
 
 import pygame
 from .sprite import Sprite, BOUNDARY
-from src.utils import Display, Sound, GraphicData, Vector
+from .pool import SpritePool
+from src.utils import Display, Sound, GraphicData, Vector, ZERO
 from src.settings import SHIP_STATUS, PATH
 from src.templates import ITEM
 
 class Item(Sprite):
-    """Manage sprites, spawning and properties of items."""
+    """Manage sprites, spawning and properties of items.
+    Killed items return to the pool and get reused by Item.create."""
+    pool = SpritePool("item")
 
     def __init__(self, template: ItemTemplate,
                 level: Level,
                 pos: Vector | None = None,
                 vel: Vector | None = None,
-                acc: Vector = Vector(0, 0),
+                acc: Vector = ZERO,
                 constraints: pygame.Rect | None = None,
                 boundary_behaviour: str | None = BOUNDARY.VANISH):
         self.template = template
-        self.level = level
-        vel = vel or Vector(0, template.speed)
-        constraints = constraints or Display.screen_rect
         self.duration_ms = int(1000 * template.duration) if template.duration is not None else None
         graphic = GraphicData(path = PATH.ITEM / f"{str(template.name)}", scaling_width = template.size)
-        super().__init__(graphic = graphic, pos = pos, vel = vel, acc = acc,
-                constraints = constraints, boundary_behaviour = boundary_behaviour)
-        
+        super().__init__(graphic = graphic)
+        self.reset(level, vel = vel, acc = acc, constraints = constraints, boundary_behaviour = boundary_behaviour)
+        if pos is not None:
+            self.spawn(pos = pos)
+
+    @classmethod
+    def create(cls, template: ItemTemplate, level: Level, **kwargs) -> Item:
+        """Reuse a killed item of the given template from the pool or create a new one.
+        Takes the same keyword arguments as Item()."""
+        item = cls.pool.acquire(template.name)
+        if item is None:
+            return cls(template, level, **kwargs)
+        pos = kwargs.pop("pos", None)
+        item.reset(level, **kwargs)
+        if pos is not None:
+            item.spawn(pos = pos)
+        return item
+
+    def reset(self, level: Level,
+                vel: Vector | None = None,
+                acc: Vector = ZERO,
+                constraints: pygame.Rect | None = None,
+                boundary_behaviour: str | None = BOUNDARY.VANISH):
+        """(Re)set the item's level and movement, see Item()."""
+        self.level = level
+        self.rng = level.rng
+        super().reset(vel = vel or Vector(0, self.template.speed), acc = acc,
+                      constraints = constraints or Display.screen_rect, boundary_behaviour = boundary_behaviour)
+
+    def kill(self):
+        """Remove the item from all groups and return it to the pool."""
+        if self.alive():
+            super().kill()
+            self.pool.release(self.template.name, self)
+
     def play_collecting_sound(self):
         match self.template.name:
             case "bullets_buff" | "magnet" | "score_buff" | "speed_buff":
@@ -49,13 +81,17 @@ class Item(Sprite):
                 Sound.bad_item.play()
 
     def update(self, dt: int):
-        """Calculate the state of the item after dt passed ms.
-        If the magnet effect is active, item's get horizontally
-        accelerated towards the ship."""
+        """Calculate the state of the item after dt passed ms."""
+        if self.moves_itself():
+            self.steer()
+        super().update(dt)
+
+    def steer(self):
+        """If the magnet effect is active, item's get horizontally
+        accelerated towards the ship. Called before the item moves,
+        by the level for items moved by the kinematics engine."""
         if self.level.ship.status == SHIP_STATUS.MAGNETIC:
             dpos = self.level.ship.center-self.center
             dist = dpos.norm
             if dist != 0:
-                acc = ITEM.MAGNET.effect * self.template.speed * dpos / dist
-                self.acc = Vector(acc.x, 0)
-        super().update(dt)
\ No newline at end of file
+                self.acc = dpos.set(ITEM.MAGNET.effect * self.template.speed * dpos.x / dist, 0)
\ No newline at end of file
@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .sprite import Sprite
+
+import warnings
+import pygame
+from .sprite import BOUNDARY
+from src.settings import SCREEN
+from src.utils import Display, Vector
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class SlotVector(Vector):
+    """Vector whose coordinates live in a sprite's slot of the kinematics engine's buffer.
+    Game logic reads and changes it like any other Vector, the engine sees the changes without copying."""
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer: memoryview, index: int):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def x(self) -> float:
+        return self.buffer[self.index]
+
+    @x.setter
+    def x(self, value: float):
+        self.buffer[self.index] = value
+
+    @property
+    def y(self) -> float:
+        return self.buffer[self.index + 1]
+
+    @y.setter
+    def y(self, value: float):
+        self.buffer[self.index + 1] = value
+
+class KinematicsEngine:
+    """Optional NumPy engine integrating the movement of many sprites at once.
+
+    Each spawned sprite gets a slot (row) in a contiguous buffer holding its position, velocity,
+    acceleration, size, constraints and boundary mode. The slots are the authoritative state:
+    the sprite's pos, vel and acc are SlotVectors on its row, so the engine never gathers
+    or scatters vectors, only the rects of moved sprites get copied back after each step.
+    Moved sprites get reindexed in their spatial hash only if they cross a cell boundary.
+    Sprites leave the engine when they are reset, killed or leave their last group, the last slot
+    then moves into the freed one to keep the slots dense. Sprites joining during the sprites' updates
+    (e.g. split asteroids) move on their own until the next step, like on the per-sprite path.
+    Boundary behaviours CLAMP, REFLECT, WRAP and VANISH are applied as masked array
+    operations with the same results as Sprite.move_to. Like in Sprite.move_to,
+    sprites with constraints but without boundary behaviour keep their position.
+    The level steps the engine before updating the sprites, which matches the order of
+    Sprite.update (moving before animating and acting), sprites leaving their constraints with
+    VANISH behaviour get killed in their update where they would have moved. Seeded runs give
+    the same level checksums on both paths, benchmarks/kinematics_parity.py compares them for every level."""
+    NONE, CLAMP, REFLECT, WRAP, VANISH, FIXED = range(6)
+    MODES = {BOUNDARY.CLAMP: CLAMP, BOUNDARY.REFLECT: REFLECT, BOUNDARY.WRAP: WRAP, BOUNDARY.VANISH: VANISH}
+    # Columns of a slot: pos, vel, acc, size (of the image), min and max bounds (x and y each),
+    # boundary mode and size of the rect (which can differ from the image's, e.g. for blobs)
+    POS, VEL, ACC, SIZE, MIN, MAX, MODE, RECT_SIZE = 0, 2, 4, 6, 8, 10, 12, 13
+    FIELDS = 15
+
+    def __init__(self, capacity: int = 256):
+        if np is None:
+            raise ImportError("The kinematics engine requires numpy.")
+        self.sprites: list[Sprite] = [] # sprite of each slot
+        self.rects: list[pygame.Rect] = [] # rect of each slot's sprite
+        self.steps = 0 # sprites joining after the last step move on their own until the next one
+        self.capacity = 0
+        self.reserve(capacity)
+
+    @classmethod
+    def create(cls) -> KinematicsEngine | None:
+        """Return an engine if numpy is available, None otherwise."""
+        if np is None:
+            warnings.warn("Can't use the kinematics engine without numpy, sprites move one by one.", RuntimeWarning)
+            return None
+        return cls()
+
+    def reserve(self, n: int):
+        """Grow the buffer (by doubling) to hold at least n sprites."""
+        if n <= self.capacity:
+            return
+        self.capacity = max(n, 2 * self.capacity)
+        data = np.zeros((self.capacity, self.FIELDS))
+        if self.sprites:
+            data[:len(self.sprites)] = self.data[:len(self.sprites)]
+        self.data = data
+        self.buffer = memoryview(data).cast("B").cast("d")
+        for sprite in self.sprites:
+            for vector in (sprite.pos, sprite.vel, sprite.acc):
+                vector.buffer = self.buffer
+
+    def add(self, sprite: Sprite):
+        """Move a spawned sprite's kinematic state into a new slot."""
+        if sprite.engine is self:
+            return
+        slot = len(self.sprites)
+        self.reserve(slot + 1)
+        c = sprite.constraints
+        mode = self.MODES.get(sprite.boundary_behaviour, self.FIXED) if c is not None else self.NONE
+        pos, vel, acc = sprite.pos, sprite.vel, sprite.acc
+        self.data[slot] = (pos.x, pos.y, vel.x, vel.y, acc.x, acc.y, sprite.w, sprite.h,
+                           *((c.x, c.y, c.right, c.bottom) if c is not None else (0, 0, 0, 0)), mode,
+                           sprite.rect.w, sprite.rect.h)
+        self.sprites.append(sprite)
+        self.rects.append(sprite.rect)
+        sprite.engine, sprite.slot, sprite.joined, sprite.vanished = self, slot, self.steps, None
+        index = slot * self.FIELDS
+        sprite._pos = SlotVector(self.buffer, index + self.POS)
+        sprite._vel = SlotVector(self.buffer, index + self.VEL)
+        sprite._acc = SlotVector(self.buffer, index + self.ACC)
+
+    def remove(self, sprite: Sprite):
+        """Give a sprite its state back as plain vectors and free its slot."""
+        if sprite.engine is not self:
+            return
+        slot, last = sprite.slot, len(self.sprites) - 1
+        sprite._pos, sprite._vel, sprite._acc = sprite.pos.copy(), sprite.vel.copy(), sprite.acc.copy()
+        sprite.engine = sprite.slot = None
+        moved = self.sprites.pop()
+        moved_rect = self.rects.pop()
+        if slot != last:
+            self.data[slot] = self.data[last]
+            self.sprites[slot] = moved
+            self.rects[slot] = moved_rect
+            moved.slot = slot
+            for vector, offset in ((moved.pos, self.POS), (moved.vel, self.VEL), (moved.acc, self.ACC)):
+                vector.index = slot * self.FIELDS + offset
+
+    def resize(self, sprite: Sprite):
+        """Update the size of a sprite after its image or rect changed."""
+        row = self.data[sprite.slot]
+        row[self.SIZE:self.SIZE + 2] = sprite.w, sprite.h
+        row[self.RECT_SIZE:self.RECT_SIZE + 2] = sprite.rect.w, sprite.rect.h
+
+    def step(self, dt: int, cell_size: int | None = None) -> list[Sprite]:
+        """Integrate the movement of all sprites in the engine for dt ms.
+        cell_size: of the spatial hash indexing the sprites, to reindex only sprites changing their cells
+        (None to reindex all moved sprites).
+        Returns the sprites that left their constraints with VANISH behaviour, marked with the step's count
+        in their vanished attribute: they kill themselves in their next update, like in Sprite.move_to."""
+        self.steps += 1
+        n = len(self.sprites)
+        if n == 0:
+            return []
+        data = self.data[:n]
+        pos, vel, acc = data[:, self.POS:self.POS + 2], data[:, self.VEL:self.VEL + 2], data[:, self.ACC:self.ACC + 2]
+        size, lo, hi = data[:, self.SIZE:self.SIZE + 2], data[:, self.MIN:self.MIN + 2], data[:, self.MAX:self.MAX + 2]
+        mode = data[:, self.MODE:self.MODE + 1]
+        rect_size = data[:, self.RECT_SIZE:self.RECT_SIZE + 2]
+
+        old_rect = np.trunc(pos)
+        # Same operations as Sprite.update_vel and update_pos, only accelerated sprites change their velocity
+        np.add(vel, dt * acc, out=vel, where=(acc != 0).any(axis=1, keepdims=True))
+        new = pos + dt * Display.grid_width / SCREEN.GRID_WIDTH * vel
+
+        # Same operand order as Sprite.move_to_xy: max(min_bound, min(pos, max_bound))
+        clamped = np.maximum(lo, np.minimum(new, hi - size))
+        reflect = (mode == self.REFLECT) & ((new - clamped) * vel > 0)
+        wrap_clamped = np.maximum(lo - size, np.minimum(new, hi))
+        wrap = (mode == self.WRAP) & (new != wrap_clamped)
+        result = new.copy()
+        np.copyto(result, clamped, where=(mode == self.CLAMP) | (mode == self.REFLECT))
+        np.copyto(result, 2 * clamped - new, where=reflect)
+        np.copyto(result, wrap_clamped, where=(mode == self.WRAP))
+        np.copyto(result, hi + lo - size - new, where=wrap)
+        np.copyto(result, pos, where=(mode == self.FIXED))
+        np.negative(vel, out=vel, where=reflect)
+        pos[:] = result
+
+        # Integer rects for blitting, only those of sprites crossing a pixel get copied back
+        rect = np.trunc(result)
+        moved = (rect != old_rect).any(axis=1)
+        rects = self.rects
+        for i, topleft in zip(np.flatnonzero(moved).tolist(), rect[moved].astype(int).tolist()):
+            rects[i].topleft = topleft
+        if cell_size is not None:
+            # Same cells as SpatialHash.cell_bounds
+            far = np.maximum(rect_size, 1) - 1
+            moved &= ((rect // cell_size != old_rect // cell_size)
+                      | ((rect + far) // cell_size != (old_rect + far) // cell_size)).any(axis=1)
+        sprites = self.sprites
+        for i in np.flatnonzero(moved).tolist():
+            sprite = sprites[i]
+            if sprite.spatial_hash is not None:
+                sprite.spatial_hash.update(sprite)
+        outside = ((mode[:, 0] == self.VANISH)
+                   & ~((rect < hi).all(axis=1) & (rect + size > lo).all(axis=1)))
+        vanished = [sprites[i] for i in np.flatnonzero(outside).tolist()]
+        for sprite in vanished:
+            sprite.vanished = self.steps
+        return vanished
@@ -0,0 +1,53 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .sprite import Sprite
+
+from collections import defaultdict
+
+class SpritePool:
+    """Free lists of killed sprites of one class, to reuse them instead of allocating new ones.
+    Short-lived sprites like bullets and items return themselves to their pool when killed,
+    get reset with new settings when acquired and are spawned again with Sprite.spawn.
+
+    name: str - Name of the pool in the statistics.
+    free: dict mapping a key (the template name) to the killed sprites available for reuse.
+    created, reused, released: Counters of newly allocated, recycled and returned sprites.
+    pools: All pools, for the statistics shown in the performance overlay."""
+    pools: list[SpritePool] = []
+
+    def __init__(self, name: str):
+        self.name = name
+        self.free: defaultdict[str, list[Sprite]] = defaultdict(list)
+        self.created = self.reused = self.released = 0
+        SpritePool.pools.append(self)
+
+    def acquire(self, key: str) -> Sprite | None:
+        """Return a released sprite for the given key, or None if a new one has to be created."""
+        free = self.free.get(key)
+        if free:
+            self.reused += 1
+            return free.pop()
+        self.created += 1
+        return None
+
+    def release(self, key: str, sprite: Sprite):
+        self.released += 1
+        self.free[key].append(sprite)
+
+    def clear(self):
+        self.free.clear()
+
+    @property
+    def available(self) -> int:
+        return sum(len(free) for free in self.free.values())
+
+    def stats(self) -> dict[str, int]:
+        return {"created": self.created, "reused": self.reused,
+                "released": self.released, "available": self.available}
+
+    @classmethod
+    def summary(cls) -> str:
+        """One line summary of all pools."""
+        return ", ".join(f"{pool.name} pool {pool.reused}/{pool.created + pool.reused} reused ({pool.available} free)"
+                         for pool in cls.pools)
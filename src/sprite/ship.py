@@ -6,12 +6,19 @@ if TYPE_CHECKING:
 
 from .sprite import Sprite, BOUNDARY
 from .bullet import Bullet
-from src.utils import Display, Sound, GraphicData, ActionTimer, Vector
+from src.utils import Display, Sound, Image, ImageCache, GraphicData, ActionTimer, Vector
 from src.settings import KEY, SHIP, SHIP_STATUS, PATH
 from src.templates import BULLET
 
 class Ship(Sprite):
     """Manage the ship's position, status properties and item effects."""
+    # Letters of the ship's image files for each status
+    LETTERS = {SHIP_STATUS.NORMAL: "a", SHIP_STATUS.INVERSE_CONTROLS: "g", SHIP_STATUS.SHIELD: "h", SHIP_STATUS.MAGNETIC: "e"}
+    # Ship images (with masks) by status letter, rank, size factor (rounded to 6 digits) and grid width,
+    # budgeted like all cached images, the ship's current image stays cached
+    variants = ImageCache("ship_variants", pinned = lambda: GraphicData.pinned_images())
+    # The ship moves on its own after the enemies acted in the frame, like on the per-sprite path
+    kinematics = None
 
     def __init__(self, level: Level,
                         lives: int = SHIP.LIVES,
@@ -152,20 +159,25 @@ class Ship(Sprite):
         if keys[KEY.SHIELD]:
             if self.status != SHIP_STATUS.SHIELD and self.shield_time > 0:
                 self.activate_shield()
-                self.vel = Vector(0,0)
+                self.vel.set(0, 0)
         else:
             if self.status == SHIP_STATUS.SHIELD:
                 self.deactivate_shield()
-            direction = Vector(keys[KEY.RIGHT]-keys[KEY.LEFT], keys[KEY.DOWN]-keys[KEY.UP])
-            self.vel = self.speed_factor * SHIP.SPEED[self.rank] * direction.normalize
+            speed = self.speed_factor * SHIP.SPEED[self.rank]
             if self.status == SHIP_STATUS.INVERSE_CONTROLS:
-                self.vel *= -1
+                speed *= -1
+            self.vel.set(keys[KEY.RIGHT]-keys[KEY.LEFT], keys[KEY.DOWN]-keys[KEY.UP]).normalize_().scale_(speed)
 
     def update_graphic(self):
-        """Upon changes of status or size, the ship's graphic must be updated."""
-        letter = {"normal":"a", "inverse_controls":"g", "shield":"h", "magnetic":"e"}[self.status]
-        self.graphic = GraphicData(path = PATH.SHIP / f"{letter}-{self.rank}.png", scaling_width = SHIP.WIDTH[self.rank])
-        self.change_image(self.graphic.image.scale_by(self.size_factor))
+        """Upon changes of status or size, the ship's image gets swapped for the memoized variant."""
+        key = (self.LETTERS[self.status], self.rank, round(self.size_factor, 6), Display.grid_width)
+        image = self.variants.get(key)
+        if image is None:
+            letter, rank, size_factor, _ = key
+            graphic = GraphicData(path = PATH.SHIP / f"{letter}-{rank}.png", scaling_width = SHIP.WIDTH[rank])
+            image = Image.scaled(graphic.image, size_factor)
+            self.variants[key] = image
+        self.change_image(image)
 
     def collect_item(self, item: Item):
         """Trigger item effects and sound. Timers are set for temporary effects."""
@@ -240,7 +252,7 @@ class Ship(Sprite):
         """Shoot missile to the given position on the screen."""
         if self.missiles > 0:
             self.missiles -= 1
-            missile = Bullet(BULLET.MISSILE)
+            missile = Bullet.create(BULLET.MISSILE)
             missile.spawn(center=pos)
             self.level.bullets.add(missile)
             missile.play_firing_sound()
@@ -1,8 +1,8 @@
 from __future__ import annotations
 import pygame
 from src.settings import SCREEN, ANIMATION_TYPE
-from src.utils import Display, Image, GraphicData, ActionTimer, Vector, Ball
-from random import choice
+from src.utils import Display, Image, GraphicData, ActionTimer, Vector, ZERO, Ball
+import random
 
 class BOUNDARY:
     '''Implemented behaviours of sprites when hitting the boundary of their
@@ -18,25 +18,40 @@ class Sprite(pygame.sprite.Sprite):
     graphic: GraphicData, for visual representation of the sprite
     pos, vel, acc: position, velocity and acceleration vectors (optional)
     - vel and acc are set to (0, 0) by default.
+    - pos and vel are owned by the sprite and get changed in place while moving,
+      acc may be shared (e.g. ZERO) and only gets replaced.
     - If no pos is provided, Sprite can be placed later using spawn(). 
     constraints, boundary_behaviour: pygame.Rect, BOUNDARY (optional)
     Movement area of the sprite and its interaction with its boundary.
     Implemented boundary behaviours:
-    - None - no boundary restriction / interaction"""
+    - None - no boundary restriction / interaction
+    rng: random.Random (optional) - random number generator for random animations
+    kinematics: KinematicsEngine spawned sprites join (optional)
+    engine, slot: The engine integrating the sprite's movement instead of update_vel / update_pos
+    and the sprite's slot in it. While in an engine, pos, vel and acc live in the engine's buffer,
+    assigning them copies the new values into the slot.
+    joined, vanished: The engine's step count when the sprite joined it (see moves_itself)
+    and when it left its constraints with VANISH behaviour in a step (it gets killed in its next update, like in move_to)."""
+    kinematics = None
 
     def __init__(self, graphic: GraphicData,
                 pos: Vector | None = None,
-                vel: Vector = Vector(0, 0),
-                acc: Vector = Vector(0, 0),
+                vel: Vector | None = None,
+                acc: Vector = ZERO,
                 constraints: pygame.Rect | None = None,
-                boundary_behaviour: str | None = None):
+                boundary_behaviour: str | None = None,
+                rng: random.Random | None = None):
         super().__init__()
-        self.pos, self.vel, self.acc = pos, vel, acc
+        self.engine = self.slot = self.joined = self.vanished = None
+        self.rng = rng
+        self.pos, self.acc = pos, acc
+        self.vel = vel if vel is not None else Vector(0, 0)
         self.graphic = graphic
         self.frame_number, self.frame_index = 0, graphic.starting_frame
         self.animation_timer = ActionTimer(graphic.frame_duration_ms, cyclic = True)
         self.constraints, self.boundary_behaviour = constraints, boundary_behaviour
         self.rect = self.graphic.image.surface.get_rect()
+        self.spatial_hash = None # gets set when added to a SpatialGroup
         self.activated = False
         if pos is not None:
             self.spawn(pos = pos)
@@ -50,12 +65,83 @@ class Sprite(pygame.sprite.Sprite):
             raise ValueError("Provide exactly one of pos, center or grid")
         if grid is not None:
             x, y = grid
-            center = Vector(x + 0.5, y + 0.5) * Display.grid_width
+            center = Vector((x + 0.5) * Display.grid_width, (y + 0.5) * Display.grid_width)
         if center is not None:
-            pos = center - Vector(self.w, self.h) / 2   
-        self.activated = True    
-        self.pos = pos  
+            pos = Vector(center.x - self.w / 2, center.y - self.h / 2)
+        self.activated = True
+        self.pos = pos.copy()
         self.move_to(self.pos)
+        if self.kinematics is not None:
+            self.kinematics.add(self)
+
+    def reset(self, vel: Vector | None = None,
+                    acc: Vector = ZERO,
+                    constraints: pygame.Rect | None = None,
+                    boundary_behaviour: str | None = None):
+        """Reset movement and animation of a killed sprite, to spawn it again (used by sprite pools).
+        The graphic's frames are kept, its orientation and image get set back to the starting frame."""
+        if self.engine is not None:
+            self.engine.remove(self)
+        self.pos, self.acc = None, acc
+        self.vel = vel if vel is not None else Vector(0, 0)
+        self.frame_number, self.frame_index = 0, self.graphic.starting_frame
+        self.graphic.flip = (False, False)
+        self.graphic.image = self.graphic.frames[self.frame_index % len(self.graphic.frames)]
+        self.animation_timer.set_alarm(self.graphic.frame_duration_ms, cyclic = True)
+        self.constraints, self.boundary_behaviour = constraints, boundary_behaviour
+        self.update_rect_size()
+        self.activated = False
+
+    # Kinematic state, kept in the sprite's slot while it's in a kinematics engine
+    @property
+    def pos(self) -> Vector | None:
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos: Vector | None):
+        if self.engine is None:
+            self._pos = pos
+        else:
+            self._pos.set(pos.x, pos.y)
+
+    @property
+    def vel(self) -> Vector:
+        return self._vel
+
+    @vel.setter
+    def vel(self, vel: Vector):
+        if self.engine is None:
+            self._vel = vel
+        else:
+            self._vel.set(vel.x, vel.y)
+
+    @property
+    def acc(self) -> Vector:
+        return self._acc
+
+    @acc.setter
+    def acc(self, acc: Vector):
+        if self.engine is None:
+            self._acc = acc
+        else:
+            self._acc.set(acc.x, acc.y)
+
+    def remove_internal(self, group: pygame.sprite.AbstractGroup):
+        """Sprites leaving their last group leave their kinematics engine."""
+        super().remove_internal(group)
+        if self.engine is not None and not self.alive():
+            self.engine.remove(self)
+
+    def moves_itself(self) -> bool:
+        """Whether update moves the sprite: outside an engine or joined it after its last step."""
+        return self.engine is None or self.joined == self.engine.steps
+
+    def kill(self):
+        """Remove the sprite from all groups and its kinematics engine
+        (pygame's kill doesn't call remove_internal)."""
+        super().kill()
+        if self.engine is not None:
+            self.engine.remove(self)
 
     # Short cuts for quick to access to graphical attributes
     @property
@@ -86,14 +172,14 @@ class Sprite(pygame.sprite.Sprite):
     @property
     def center(self) -> Vector:
         if self.activated:
-            return self.pos + self.diag / 2
-        return Vector(self.rect.center)
+            return Vector(self.pos.x + self.w / 2, self.pos.y + self.h / 2)
+        return Vector(*self.rect.center)
         
     @property
     def midbottom(self) -> Vector:
         if self.activated:
-            return self.pos + Vector(self.w / 2, self.h)
-        return Vector(self.rect.midbottom)
+            return Vector(self.pos.x + self.w / 2, self.pos.y + self.h)
+        return Vector(*self.rect.midbottom)
 
     # Absolute speed calculated from the velocity vector
     @property
@@ -108,9 +194,9 @@ class Sprite(pygame.sprite.Sprite):
   
     def change_image(self, image: Image):
         """changes the image preserving the center of the sprite"""
-        center = Vector(self.rect.centerx, self.rect.centery)
+        center_x, center_y = self.rect.center
         self.set_image(image)
-        self.move_to(center - self.diag / 2)
+        self.move_to_xy(center_x - self.w / 2, center_y - self.h / 2)
 
     def scale_image_by(self, factor: float):
         """rescales the image preserving the center of the sprite"""
@@ -119,63 +205,81 @@ class Sprite(pygame.sprite.Sprite):
     # The pygame.Rect attribute is needed for blitting the sprite,
     # should not be manipulated externally, only automatically
     # updated upon positional or graphical change of the sprite
+    # (together with the sprite's cells in the level's spatial hash)
     def update_rect_pos(self):
         self.rect.x, self.rect.y = int(self.pos.x), int(self.pos.y)
+        if self.spatial_hash is not None:
+            self.spatial_hash.update(self)
 
     def update_rect_size(self):
         self.rect.w, self.rect.h = int(self.w), int(self.h)
+        if self.engine is not None:
+            self.engine.resize(self)
+        if self.spatial_hash is not None:
+            self.spatial_hash.update(self)
 
     def move_to(self, pos: Vector):
         """Move the sprite respecting its boundary behaviour."""
-        if self.constraints is None or self.boundary_behaviour == BOUNDARY.VANISH:
-            self.pos = pos
+        self.move_to_xy(pos.x, pos.y)
+
+    def move_to_xy(self, x: float, y: float):
+        """Move the sprite to coordinates x, y respecting its boundary behaviour.
+        Changes pos (and vel when reflecting) in place without allocating new vectors."""
+        if self.pos is None:
+            self.pos = Vector(x, y)
+        constraints, behaviour = self.constraints, self.boundary_behaviour
+        if constraints is None or behaviour == BOUNDARY.VANISH:
+            self.pos.set(x, y)
             self.update_rect_pos()
-            if self.boundary_behaviour == BOUNDARY.VANISH and not self.rect.colliderect(self.constraints):
+            if behaviour == BOUNDARY.VANISH and not self.rect.colliderect(constraints):
                 self.kill()
             return
-        min_bound = Vector(self.constraints.x, self.constraints.y)
-        max_bound = Vector(self.constraints.right, self.constraints.bottom)
-        if self.boundary_behaviour == BOUNDARY.CLAMP:
-            self.pos = pos.clamp(min_bound, max_bound - self.diag)
-        elif self.boundary_behaviour == BOUNDARY.REFLECT:
-            pos_clamp = pos.clamp(min_bound, max_bound - self.diag)
-            diff = pos - pos_clamp
+        x_min, y_min = constraints.x, constraints.y
+        x_max, y_max = constraints.right, constraints.bottom
+        if behaviour == BOUNDARY.CLAMP:
+            self.pos.set(x, y).clamp_into(x_min, y_min, x_max - self.w, y_max - self.h)
+        elif behaviour == BOUNDARY.REFLECT:
+            clamp_x = max(x_min, min(x, x_max - self.w))
+            clamp_y = max(y_min, min(y, y_max - self.h))
 
             #reflection only prevents exiting, not entering the constraints
-            reflect_x = diff.x * self.vel.x > 0
-            reflect_y = diff.y * self.vel.y > 0
+            reflect_x = (x - clamp_x) * self.vel.x > 0
+            reflect_y = (y - clamp_y) * self.vel.y > 0
 
-            self.pos.x = 2 * pos_clamp.x - pos.x if reflect_x else pos_clamp.x
-            self.pos.y = 2 * pos_clamp.y - pos.y if reflect_y else pos_clamp.y
-
-            self.vel.x *= -1 if reflect_x else 1
-            self.vel.y *= -1 if reflect_y else 1
+            self.pos.set(2 * clamp_x - x if reflect_x else clamp_x,
+                         2 * clamp_y - y if reflect_y else clamp_y)
+            if reflect_x:
+                self.vel.x *= -1
+            if reflect_y:
+                self.vel.y *= -1
                 
-        elif self.boundary_behaviour == BOUNDARY.WRAP:
+        elif behaviour == BOUNDARY.WRAP:
             # wrapping happens when leaving the the constraints entirely
-            pos_clamp = pos.clamp(min_bound - self.diag, max_bound)
-            wrap_x = pos.x != pos_clamp.x
-            wrap_y = pos.y != pos_clamp.y
+            clamp_x = max(x_min - self.w, min(x, x_max))
+            clamp_y = max(y_min - self.h, min(y, y_max))
 
-            self.pos.x = self.constraints.right + self.constraints.x - self.w - pos.x if wrap_x else pos_clamp.x
-            self.pos.y = self.constraints.bottom + self.constraints.y - self.h - pos.y if wrap_y else pos_clamp.y
+            self.pos.set(x_max + x_min - self.w - x if x != clamp_x else clamp_x,
+                         y_max + y_min - self.h - y if y != clamp_y else clamp_y)
         self.update_rect_pos()
-        if self.boundary_behaviour == BOUNDARY.VANISH and not self.rect.colliderect(self.constraints):
-            self.kill()
 
     def update(self, dt: int):
         """Calculate the state of the sprite after dt passed ms"""
         if self.activated:
-            self.update_vel(dt)
-            self.update_pos(dt)
+            if self.moves_itself():
+                self.update_vel(dt)
+                self.update_pos(dt)
+            elif self.vanished == self.engine.steps:
+                self.kill()
             self.animation_timer.update(dt)
             self.update_frame(dt)    
 
     def update_vel(self, dt: int):
-        self.vel += dt * self.acc
+        if self.acc.x or self.acc.y:
+            self.vel.iadd(self.acc, dt)
 
     def update_pos(self, dt: int):
-        self.move_to(self.pos + dt * self.vel * Display.grid_width / SCREEN.GRID_WIDTH)
+        k = dt * Display.grid_width / SCREEN.GRID_WIDTH
+        self.move_to_xy(self.pos.x + k * self.vel.x, self.pos.y + k * self.vel.y)
     
     def update_frame(self, dt: int):
         """Update the Sprite's image to a new animation frame if needed."""
@@ -187,14 +291,14 @@ class Sprite(pygame.sprite.Sprite):
                 self.activated = False
                 self.kill()
                 return
-            self.change_image(self.graphic.frames[self.frame_index])
+            self.change_image(self.graphic.frame(self.frame_index))
 
     def next_frame(self):
         """Determine the next frame in the animation depending on provided animation type."""
         self.frame_number += 1
         match self.graphic.animation_type:
             case None: return
-            case ANIMATION_TYPE.RANDOM: self.frame_index = choice(range(len(self.graphic.frames)))
+            case ANIMATION_TYPE.RANDOM: self.frame_index = (self.rng or random).choice(range(len(self.graphic.frames)))
             case ANIMATION_TYPE.VANISH:
                 if self.frame_number >= len(self.graphic.frames):
                     self.frame_index = None
@@ -209,7 +313,7 @@ class Sprite(pygame.sprite.Sprite):
 
     def reflect(self, flip_x: bool, flip_y: bool):
         """Reflects direction of movement and all graphical data along given axes."""
-        self.vel *= -1
+        self.vel.scale_(-1)
         self.graphic.reflect(flip_x, flip_y)
 
     def blit(self, screen: pygame.Surface):
@@ -1,10 +1,20 @@
 from .display import Display
-from .image import Image, GraphicData
+from .cache import ImageCache
+from .archive import ImageArchive
+from .writer import ImageWriter
+from .manifest import ImageManifest
+from .image import Image, GraphicData, FrameSet
 from .sound import Sound
 from .timer import Timer, ActionTimer
-from .physics import Vector, Ball, elastic_collision, inelastic_collision, ball_collision_data
+from .physics import Vector, ZERO, Ball, elastic_collision, inelastic_collision, ball_collision_data
+from .spatial import SpatialHash, SpatialGroup
+from .observation import Observation
+from .perf import Perf
+from .profiler import SamplingProfiler
+from .memory import MemoryStats
 
 __all__ = [
-    Display, Image, GraphicData, Sound, Timer, ActionTimer,
-    Vector, Ball, elastic_collision, inelastic_collision, ball_collision_data
+    Display, ImageCache, ImageArchive, ImageWriter, ImageManifest, Image, GraphicData, FrameSet, Sound, Timer, ActionTimer,
+    Vector, ZERO, Ball, elastic_collision, inelastic_collision, ball_collision_data,
+    SpatialHash, SpatialGroup, Observation, Perf, SamplingProfiler, MemoryStats
 ]
\ No newline at end of file
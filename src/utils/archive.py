@@ -0,0 +1,130 @@
+from __future__ import annotations
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+from weakref import WeakSet
+import pygame
+from .display import Display
+from src.settings import PATH
+
+class ImageArchive:
+    """Packed archive of the preprocessed images of one resolution, replacing a directory of small PNGs.
+
+    File layout: magic, length of the JSON index, the index and the entries, each aligned to ALIGN bytes.
+    The index maps the image paths relative to PATH.IMAGES to their size and the offsets (from the first entry) of
+    - the raw pixels in BGRA byte order (the display's ARGB format on little endian machines) and
+    - the mask bits in pygame's native layout (words of unsigned longs).
+    The file gets memory-mapped copy-on-write: surfaces are created on the mapped pages without copying,
+    only the mask bits get copied into new masks. Loading is dominated by page faults instead of PNG decoding,
+    and game processes on the same machine share the pages of the archive.
+
+    surfaces: Surfaces created on the mapped pages, they must be released (or replaced by copies) before the archive gets closed.
+    archives: Opened archives by grid width, None if there is no (valid) archive for that resolution."""
+    MAGIC = b"SSIMGPK1"
+    ALIGN = 64
+    FORMAT = "BGRA"
+    archives: dict[int, ImageArchive | None] = {}
+    lock = threading.Lock()
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_COPY)
+        magic, index_length = struct.unpack_from("<8sQ", self.buffer)
+        if magic != self.MAGIC:
+            raise ValueError(f"{self.path} is not an image archive")
+        header = json.loads(self.buffer[16:16 + index_length])
+        if header["platform"] != self.platform():
+            raise ValueError(f"{self.path} was packed on an incompatible platform")
+        self.entries: dict[str, list[int]] = header["entries"]
+        self.view = memoryview(self.buffer)[self.aligned(16 + index_length):]
+        self.surfaces: WeakSet[pygame.Surface] = WeakSet()
+
+    def close(self):
+        """Unmap the archive. Fails with BufferError while surfaces on its pages are still alive."""
+        self.view.release()
+        self.buffer.close()
+
+    @staticmethod
+    def platform() -> list:
+        """Byte order and mask word size, the mask bits are only valid on machines sharing them."""
+        return [sys.byteorder, struct.calcsize("L")]
+
+    @staticmethod
+    def path_for(grid_width: int) -> Path:
+        return PATH.PREPROCESSED / f"grid_width={grid_width}.pack"
+
+    @classmethod
+    def current(cls) -> ImageArchive | None:
+        """The archive of the current resolution, opened on the first request."""
+        grid_width = Display.grid_width
+        if grid_width not in cls.archives:
+            with cls.lock:
+                if grid_width not in cls.archives:
+                    path = cls.path_for(grid_width)
+                    try:
+                        cls.archives[grid_width] = cls(path) if path.exists() else None
+                    except (ValueError, KeyError, struct.error) as error:
+                        print(f"Warning: Ignoring image archive {path}: {error}")
+                        cls.archives[grid_width] = None
+        return cls.archives[grid_width]
+
+    def __contains__(self, relpath: str) -> bool:
+        return relpath in self.entries
+
+    def get(self, relpath: str) -> tuple[pygame.Surface, pygame.Mask] | None:
+        """Surface on the mapped pixels and a copy of the mask of an archived image."""
+        entry = self.entries.get(relpath)
+        if entry is None:
+            return None
+        w, h, pixels, mask_offset, mask_length = entry
+        surface = pygame.image.frombuffer(self.view[pixels:pixels + 4 * w * h], (w, h), self.FORMAT)
+        self.surfaces.add(surface)
+        mask = pygame.Mask((w, h))
+        memoryview(mask).cast("B")[:] = self.view[mask_offset:mask_offset + mask_length]
+        return surface, mask
+
+    @classmethod
+    def aligned(cls, n: int) -> int:
+        return (n + cls.ALIGN - 1) // cls.ALIGN * cls.ALIGN
+
+    @classmethod
+    def write(cls, path: str | Path, images: dict[str, tuple[pygame.Surface, pygame.Mask]]):
+        """Pack surfaces and masks keyed by their relative path into an archive.
+        The archive gets written to a temporary file and renamed, so readers never see a partial archive.
+        An opened archive at the path gets closed before (mapped files can't be replaced on Windows),
+        the new file gets opened in its place afterwards."""
+        path = Path(path)
+        blobs, entries = [], {}
+        offset = 0
+        for relpath, (surface, mask) in sorted(images.items()):
+            w, h = surface.get_size()
+            pixels = pygame.image.tobytes(surface, cls.FORMAT)
+            mask_bits = memoryview(mask).cast("B").tobytes()
+            entries[relpath] = [w, h, offset, offset + cls.aligned(len(pixels)), len(mask_bits)]
+            blobs += [pixels, mask_bits]
+            offset += cls.aligned(len(pixels)) + cls.aligned(len(mask_bits))
+        index = json.dumps({"platform": cls.platform(), "entries": entries}).encode()
+        path.parent.mkdir(parents = True, exist_ok = True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as file:
+            file.write(struct.pack("<8sQ", cls.MAGIC, len(index)))
+            file.write(index.ljust(cls.aligned(16 + len(index)) - 16))
+            for blob in blobs:
+                file.write(blob.ljust(cls.aligned(len(blob)), b"\0"))
+        with cls.lock:
+            grid_widths = [grid_width for grid_width in cls.archives if cls.path_for(grid_width) == path]
+            for grid_width in grid_widths:
+                archive = cls.archives.pop(grid_width)
+                if archive is not None:
+                    try:
+                        archive.close()
+                    except BufferError:
+                        print(f"Warning: Image archive {path} is still in use and stays mapped")
+            os.replace(temp_path, path)
+            for grid_width in grid_widths:
+                cls.archives[grid_width] = cls(path)
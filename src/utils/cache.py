@@ -0,0 +1,165 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Hashable
+if TYPE_CHECKING:
+    from .image import Image
+
+import struct
+import threading
+from collections import OrderedDict
+from itertools import count
+import pygame
+from src.settings import PERFORMANCE
+
+MASK_BITS = 8 * struct.calcsize("L") # pygame masks store their bits in words of unsigned longs
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
+
+def mask_bytes(mask: pygame.Mask) -> int:
+    w, h = mask.get_size()
+    return (w + MASK_BITS - 1) // MASK_BITS * MASK_BITS // 8 * h
+
+def image_bytes(image: Image) -> int:
+    return surface_bytes(image.surface) + mask_bytes(image.mask)
+
+class ImageCache:
+    """Mapping of images with least recently used eviction under a byte budget shared by all image caches.
+    When the cached images of all caches exceed the budget, the least recently used entries get evicted.
+    Pinned entries (e.g. used by live sprites) are never evicted, they are treated as recently used instead.
+    Entries can also be values holding several images (e.g. frame sets), an image held by
+    several entries of any caches counts once against the budget.
+
+    name: str - Name of the cache in the statistics.
+    pinned: Callable returning the ids of the pinned entries, evaluated once per eviction.
+    images: Callable returning the images of an entry, for caches of other values than images.
+    bytes: Bytes of the images of the cache's entries.
+    hits, misses, evictions: Counters of lookups and evicted entries.
+    caches: All image caches sharing the budget.
+    budget: Bytes of pixels and masks of all cached images, None for no limit.
+    refs: Cached images by id with the number of entries holding them.
+    shared_bytes: Bytes of all cached images, each counted once."""
+    caches: list[ImageCache] = []
+    budget: int | None = PERFORMANCE.IMAGE_CACHE_BUDGET
+    lock = threading.RLock() # the preloader fills the caches from several threads
+    clock = count() # orders the uses of images across caches
+    refs: dict[int, list] = {} # id: [image, number of entries]
+    shared_bytes = 0
+
+    def __init__(self, name: str, pinned: Callable[[], set[int]] | None = None, images: Callable | None = None):
+        self.name = name
+        self.pinned = pinned
+        self.images = images or (lambda image: (image,))
+        self.entries: OrderedDict[Hashable, list] = OrderedDict() # key: [value, bytes, last use]
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        ImageCache.caches.append(self)
+
+    def get(self, key: Hashable, default: Image | None = None) -> Image | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.entries.move_to_end(key)
+            entry[2] = next(self.clock)
+            return entry[0]
+
+    def __getitem__(self, key: Hashable) -> Image:
+        image = self.get(key)
+        if image is None:
+            raise KeyError(key)
+        return image
+
+    def __setitem__(self, key: Hashable, image: Image):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+                self.release(old[0])
+            size = sum(image_bytes(held) for held in self.images(image))
+            self.entries[key] = [image, size, next(self.clock)]
+            self.bytes += size
+            self.retain(image)
+            if self.budget is not None and self.total_bytes() > self.budget:
+                self.evict(self.budget)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def keys(self):
+        return self.entries.keys()
+
+    def values(self) -> list[Image]:
+        with self.lock:
+            return [entry[0] for entry in self.entries.values()]
+
+    def items(self) -> list[tuple[Hashable, Image]]:
+        with self.lock:
+            return [(key, entry[0]) for key, entry in self.entries.items()]
+
+    def clear(self):
+        with self.lock:
+            for entry in self.entries.values():
+                self.release(entry[0])
+            self.entries.clear()
+            self.bytes = 0
+
+    def retain(self, value):
+        """Count the images of a new entry, those already held by other entries are counted once."""
+        for image in self.images(value):
+            ref = ImageCache.refs.get(id(image))
+            if ref is None:
+                ImageCache.refs[id(image)] = [image, 1]
+                ImageCache.shared_bytes += image_bytes(image)
+            else:
+                ref[1] += 1
+
+    def release(self, value) -> int:
+        """Uncount the images of a removed entry, return the bytes of those no other entry holds."""
+        freed = 0
+        for image in self.images(value):
+            ref = ImageCache.refs[id(image)]
+            ref[1] -= 1
+            if ref[1] == 0:
+                del ImageCache.refs[id(image)]
+                freed += image_bytes(image)
+        ImageCache.shared_bytes -= freed
+        return freed
+
+    @classmethod
+    def total_bytes(cls) -> int:
+        return cls.shared_bytes
+
+    @classmethod
+    def evict(cls, budget: int):
+        """Evict the least recently used unpinned entries of all caches until their images fit into the budget."""
+        with cls.lock:
+            pinned = {cache: cache.pinned() if cache.pinned is not None else set() for cache in cls.caches}
+            total = cls.total_bytes()
+            while total > budget:
+                oldest = None
+                for cache in cls.caches:
+                    # Pinned images at the front of a cache get moved to its end, like when they're used.
+                    for _ in range(len(cache.entries)):
+                        key, entry = next(iter(cache.entries.items()))
+                        if id(entry[0]) not in pinned[cache]:
+                            if oldest is None or entry[2] < oldest[2]:
+                                oldest = (cache, key, entry[2])
+                            break
+                        cache.entries.move_to_end(key)
+                        entry[2] = next(cls.clock)
+                if oldest is None:
+                    return # everything left is pinned
+                cache, key, _ = oldest
+                value, size, _ = cache.entries.pop(key)
+                cache.bytes -= size
+                cache.evictions += 1
+                total -= cache.release(value)
+
+    def stats(self) -> dict[str, int]:
+        return {"images": len(self.entries), "bytes": self.bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -1,4 +1,6 @@
+import os
 import pygame
+from .perf import Perf
 
 class Display:
     """Manage fullscreen rendering and grid layout for the game.
@@ -14,7 +16,10 @@ class Display:
         with automatically set parameters screen_rect, screen_width, screen_height, screen_size.
         Gets subdivided into a rectangle of square grid cells with parameters
         grid: tuple[int, int] and grid_width.
-        Gets padded for rendering on the screen with int parameters padding_w, padding_h"""
+        Gets padded for rendering on the screen with int parameters padding_w, padding_h
+    headless: bool
+        True if the game renders into an invisible window of the SDL dummy video driver
+        (for simulations on machines without a display)."""
     display: pygame.Surface | None = None
     screen: pygame.Surface | None = None
     screen_rect: pygame.Rect | None = None
@@ -25,13 +30,24 @@ class Display:
     grid_width: int = 0
     padding_w: int = 0
     padding_h: int = 0
+    headless: bool = False
 
-    def __init__(self, screen_size: tuple[int, int], screen_grid: tuple[int, int]):
-        """Initialize the internal game surface 'screen' with given aspect ratio and grid layout"""
+    def __init__(self, screen_size: tuple[int, int], screen_grid: tuple[int, int],
+                headless: bool = False, window_size: tuple[int, int] | None = None):
+        """Initialize the internal game surface 'screen' with given aspect ratio and grid layout.
+        If headless is True, use a window of window_size (default: screen_size) on the SDL dummy video driver."""
+        Display.headless = headless
+        if headless:
+            pygame.display.quit()
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
         pygame.display.init()
-        info = pygame.display.Info()
-        max_width, max_height = info.current_w, info.current_h
-        Display.display = pygame.display.set_mode((max_width, max_height), pygame.FULLSCREEN)
+        if headless:
+            max_width, max_height = window_size or screen_size
+            Display.display = pygame.display.set_mode((max_width, max_height))
+        else:
+            info = pygame.display.Info()
+            max_width, max_height = info.current_w, info.current_h
+            Display.display = pygame.display.set_mode((max_width, max_height), pygame.FULLSCREEN)
 
         w, h = screen_size
         
@@ -58,12 +74,14 @@ class Display:
         Display.grid_width = Display.screen_width // screen_grid[0]
 
     @classmethod
-    def init(cls, screen_size: tuple[int, int], screen_grid: tuple[int, int]) -> pygame.Surface:
+    def init(cls, screen_size: tuple[int, int], screen_grid: tuple[int, int],
+                headless: bool = False, window_size: tuple[int, int] | None = None) -> pygame.Surface:
         """Convenience method to initialize the display and ontain the internal game surface."""
-        cls(screen_size, screen_grid)
+        cls(screen_size, screen_grid, headless, window_size)
         return cls.screen
 
     @classmethod
+    @Perf.timed("Display.update")
     def update(cls, padding_color: tuple):
         """Blit internal game surface centered on the fullscreen display"""
         cls.display.fill(padding_color)
@@ -1,19 +1,36 @@
 from __future__ import annotations
 import pygame
 from .display import Display
+from .perf import Perf
+from .archive import ImageArchive
+from .writer import ImageWriter
+from .manifest import ImageManifest
+from .cache import ImageCache
 from src.settings import COLOR, SCREEN, PATH, ANIMATION_TYPE
 from pathlib import Path
+from array import array
+import threading
 from dataclasses import dataclass
+from typing import ClassVar
+from weakref import WeakValueDictionary
+
+REVERSED_BITS = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256)) # translation table reversing the bits of a byte
 
 class Image:
     '''Manage lazy loading and transforming images and masks to be used for sprites.'''
+    live = WeakValueDictionary() # all existing images by id, for memory accounting
+
     def __init__(self, surface: pygame.Surface,
                     mask: pygame.Mask,
                     colorkey: tuple = None,
-                    path: str | None = None):
+                    path: str | None = None,
+                    flip: tuple[bool, bool] = (False, False)):
+        """flip: whether the image is reflected along the x and y axis compared to its file."""
         self.surface = surface
         self.mask = mask
         self.path = path
+        self.flip = flip
+        Image.live[id(self)] = self
         if colorkey:
             self.surface.set_colorkey(colorkey)
 
@@ -34,7 +51,32 @@ class Image:
     def scale_by(self, factor: float) -> Image:
         '''Rescale image and its mask by a given factor.'''
         return Image(pygame.transform.scale(self.surface, (factor*self.w, factor*self.h)).convert_alpha(),
-            self.mask.scale((factor*self.w, factor*self.h)))
+            self.mask.scale((factor*self.w, factor*self.h)), path = self.path, flip = self.flip)
+
+    @classmethod
+    def scaled(cls, image: Image, factor: float) -> Image:
+        '''Variant of an image scaled by a factor, shared through the image cache.
+            Used for sprites changing their size often, e.g. blobs and their blubber for each energy.'''
+        size = (int(factor * image.w), int(factor * image.h))
+        if size == image.rect.size:
+            return image
+        key = (image.path, image.flip, size)
+        scaled_image = cls.cache.get(key)
+        if scaled_image is None:
+            scaled_image = image.scale_by(factor)
+            cls.cache[key] = scaled_image
+        return scaled_image
+
+    def rescaling_factor(self, scaling_width: float = None,
+                    scaling_height: float = None,
+                    scaling_factor: float = None) -> float | None:
+        '''Factor to rescale the image to a given width or height
+        with respect to the default screen resolution, or the specified factor.'''
+        if scaling_width:
+            return Display.grid_width / SCREEN.GRID_WIDTH * scaling_width / self.w
+        if scaling_height:
+            return Display.grid_width / SCREEN.GRID_WIDTH * scaling_height / self.h
+        return scaling_factor or None
 
     def rescale(self, scaling_width: float = None,
                     scaling_height: float = None,
@@ -42,49 +84,129 @@ class Image:
         '''Rescale image either to a given width or height
         with respect to the default screen resolution,
         or by a specified factor.'''
-        factor = None
-        if scaling_width:
-            factor = Display.grid_width / SCREEN.GRID_WIDTH * scaling_width / self.w
-        elif scaling_height:
-            factor = Display.grid_width / SCREEN.GRID_WIDTH * scaling_height / self.h
-        elif scaling_factor:
-            factor = scaling_factor
+        factor = self.rescaling_factor(scaling_width, scaling_height, scaling_factor)
         if factor is None:
             return self
         return self.scale_by(factor)
 
-    cache = {}
+    # Loaded images keyed by (path, colorkey, size), size None for the unscaled preprocessed image,
+    # and scaled and reflected variants keyed by (path, flip, size)
+    cache = ImageCache("cache", pinned = lambda: GraphicData.pinned_images())
     @classmethod
     def load(cls, path: str, colorkey=COLOR.BLACK, scaling_width=None, scaling_height=None, scaling_factor=None) -> Image:
         '''Load image with given path lazily and preprocess the image upon first loading.
             Background of color 'colorkey' gets cropped and transparent.
             Then rescale either to desired width, height (wrt default screen resolution)
             or by a given scaling factor.
-            Cache the result and save it to the disk for quick access next time.'''
-        if path in cls.cache:
-            return cls.cache[path].rescale(scaling_width=scaling_width, scaling_height=scaling_height, scaling_factor=scaling_factor)
+            Cache the result and save it to the disk for quick access next time.
+            Identical requests return the same Image, so loaded images must not be modified:
+            sprites changing their image replace it with a new one (e.g. from scale_by).'''
         path_obj = Path(path)
         if not path_obj.suffix:
             path_obj = path_obj.with_suffix(".png")
-        relpath = Path(path_obj).relative_to(PATH.IMAGES)
-        newpath = PATH.PREPROCESSED / f"grid_width={Display.grid_width}" / relpath
-
-        if newpath.exists():
-            # If the image has been preprocessed before, load it into the game's cache.
-            surface = pygame.image.load(newpath)
-            mask = pygame.mask.from_surface(surface)
-            image = Image(surface, mask, path = str(path_obj))
-            cls.cache[str(path_obj)] = image
-            return image.rescale(scaling_width=scaling_width, scaling_height=scaling_height, scaling_factor=scaling_factor)
-
-        image = Image.preprocess(str(path_obj), colorkey=colorkey, scaling_width=scaling_width, scaling_height=scaling_height, scaling_factor=scaling_factor)
-        # Cache the preprocessed image for quick access in the current game.
-        cls.cache[str(path_obj)] = image
-        # Save it to the disk for the next time the game gets opened.
-        newpath.parent.mkdir(parents = True, exist_ok = True)
-        pygame.image.save(image.surface, str(newpath))
-        
-        return image.rescale(scaling_width=scaling_width, scaling_height=scaling_height, scaling_factor=scaling_factor)
+        path = str(path_obj)
+        image = cls.cache.get((path, colorkey, None))
+        if image is None:
+            image = cls.load_unscaled(path_obj, colorkey, scaling_width, scaling_height, scaling_factor)
+        factor = image.rescaling_factor(scaling_width, scaling_height, scaling_factor)
+        if factor is None:
+            return image
+        size = (int(factor * image.w), int(factor * image.h))
+        if size == image.rect.size:
+            return image
+        scaled_image = cls.cache.get((path, colorkey, size))
+        if scaled_image is None:
+            scaled_image = image.scale_by(factor)
+            cls.cache[(path, colorkey, size)] = scaled_image
+        return scaled_image
+
+    @classmethod
+    def load_unscaled(cls, path: Path, colorkey=COLOR.BLACK, scaling_width=None, scaling_height=None, scaling_factor=None) -> Image:
+        '''Load the preprocessed image from the archive or the disk if the manifest lists it as fresh,
+            otherwise preprocess it (scaled to the first requested size).
+            Cache it as base for all scaled variants.'''
+        Perf.event(f"Image.load cache miss {path.name}")
+        relpath = path.relative_to(PATH.IMAGES).as_posix()
+        manifest = cls.manifest()
+        parameters = ImageManifest.parameters(colorkey, scaling_width, scaling_height, scaling_factor)
+        image = cls.load_preprocessed(path, relpath, manifest) if manifest.is_fresh(relpath, parameters) else None
+        if image is None:
+            image = cls.rebuild(path, colorkey, scaling_width, scaling_height, scaling_factor)
+        cls.cache[(str(path), colorkey, None)] = image
+        return image
+
+    @staticmethod
+    def preprocessed_path(relpath: str) -> Path:
+        return PATH.PREPROCESSED / f"grid_width={Display.grid_width}" / relpath
+
+    @classmethod
+    def load_preprocessed(cls, path: Path, relpath: str, manifest: ImageManifest) -> Image | None:
+        '''Map a preprocessed image from the archive or decode its PNG, None if it's missing.'''
+        archive = ImageArchive.current()
+        packed = archive.get(relpath) if archive is not None and manifest.is_packed(relpath) else None
+        if packed is not None:
+            # Packed images are mapped from the resolution's archive without decoding.
+            surface, mask = packed
+            return Image(surface, mask, path = str(path))
+        try:
+            surface = pygame.image.load(cls.preprocessed_path(relpath)).convert_alpha()
+        except (FileNotFoundError, pygame.error):
+            return None
+        return Image(surface, pygame.mask.from_surface(surface), path = str(path))
+
+    @classmethod
+    def rebuild(cls, path: Path, colorkey=COLOR.BLACK, scaling_width=None, scaling_height=None, scaling_factor=None) -> Image:
+        '''Preprocess an image and save it in the background for the next time the game gets opened.
+            It's recorded in the manifest once it's saved.'''
+        image = Image.preprocess(str(path), colorkey=colorkey, scaling_width=scaling_width, scaling_height=scaling_height, scaling_factor=scaling_factor)
+        relpath = path.relative_to(PATH.IMAGES).as_posix()
+        parameters = ImageManifest.parameters(colorkey, scaling_width, scaling_height, scaling_factor)
+        manifest = ImageManifest.current()
+        manifest.pending.add(relpath)
+        ImageWriter.save(image.surface, cls.preprocessed_path(relpath), saved = lambda: manifest.record(relpath, parameters))
+        return image
+
+    @classmethod
+    def manifest(cls) -> ImageManifest:
+        '''The manifest of the current resolution. Its stale images get rebuilt in a background thread.'''
+        manifest = ImageManifest.current()
+        with ImageManifest.lock:
+            if manifest.rebuild_thread is None:
+                manifest.rebuild_thread = threading.Thread(target = cls.rebuild_stale, args = (manifest,),
+                                                           name = "ImageRebuild", daemon = True)
+                manifest.rebuild_thread.start()
+        return manifest
+
+    @classmethod
+    def rebuild_stale(cls, manifest: ImageManifest):
+        for relpath, (colorkey, scaling_width, scaling_height, scaling_factor) in manifest.stale().items():
+            if relpath in manifest.pending:
+                continue # already rebuilt on request
+            cls.rebuild(PATH.IMAGES / relpath, tuple(colorkey) if colorkey else None, scaling_width, scaling_height, scaling_factor)
+
+    @classmethod
+    def pack(cls) -> int:
+        '''Pack the preprocessed images recorded in the manifest into the archive of the current resolution.
+            Masks get rebuilt from the surfaces like when loading the preprocessed PNGs.
+            Returns the number of packed images.'''
+        ImageWriter.flush() # images get recorded once they're saved
+        manifest = ImageManifest.current()
+        archive = ImageArchive.current()
+        if archive is not None:
+            # Images mapped from the old archive get their own pixels, so it can be closed and replaced
+            for image in list(cls.live.values()):
+                if image.surface in archive.surfaces:
+                    image.surface = image.surface.copy()
+        images = {}
+        for (path, colorkey, size), image in list(cls.cache.items()):
+            if size is None and Path(path).is_relative_to(PATH.IMAGES):
+                relpath = Path(path).relative_to(PATH.IMAGES).as_posix()
+                if relpath in manifest.entries:
+                    images[relpath] = (image.surface, pygame.mask.from_surface(image.surface))
+        ImageArchive.write(ImageArchive.path_for(Display.grid_width), images)
+        manifest.mark_packed(list(images))
+        manifest.save()
+        return len(images)
 
     @classmethod
     def preprocess(cls, path: str,
@@ -120,32 +242,94 @@ class Image:
         cropped_surface.blit(temp, (0,0), bounding_rect)
         return cropped_surface
 
-    reflected_cache = {}
     @classmethod
     def reflect(cls, image: Image, flip_x: bool, flip_y: bool) -> Image:
-        """Reflect an image (including it's mask) along the specified axes."""
+        """Reflect an image (including it's mask) along the specified axes.
+        Reflected variants are shared with the scaled ones through the image cache,
+        keyed by their orientation, so reflecting twice gives back an image of the original orientation."""
         if not (flip_x or flip_y):
             return image
-        if (image.path, image.w, image.h, flip_x, flip_y) in cls.reflected_cache.keys():
-            return cls.reflected_cache[(image.path, image.w, image.h, flip_x, flip_y)]
+        flip = (image.flip[0] != flip_x, image.flip[1] != flip_y)
+        key = (image.path, flip, image.rect.size)
+        flipped_image = cls.cache.get(key)
+        if flipped_image is not None:
+            return flipped_image
+        Perf.event(f"Image.reflect cache miss {Path(image.path or '').name}")
         flipped_surface = pygame.transform.flip(image.surface, flip_x=flip_x, flip_y=flip_y)
-        flipped_image = Image(flipped_surface, pygame.mask.from_surface(flipped_surface), path = image.path)
-        cls.reflected_cache[(image.path, image.w, image.h, flip_x, flip_y)] = flipped_image
-        return flipped_image            
+        flipped_image = Image(flipped_surface, cls.flip_mask(image.mask, flip_x, flip_y), path = image.path, flip = flip)
+        cls.cache[key] = flipped_image
+        return flipped_image
+
+    @staticmethod
+    def flip_mask(mask: pygame.Mask, flip_x: bool, flip_y: bool) -> pygame.Mask:
+        """Reflect a mask by permuting its bits instead of rebuilding it from the reflected pixels.
+        The bits are stored in stripes of words (each covering one word wide column of the mask), row by row."""
+        w, h = mask.get_size()
+        words = memoryview(mask)
+        stripes, word_bits = words.shape[0], 8 * words.itemsize
+        if flip_x:
+            # Reversing all bytes and the bits of each byte reflects the mask, padded to whole words, along both axes.
+            bits = array(words.format, bytes(words).translate(REVERSED_BITS)[::-1])
+            flip_y = not flip_y
+        else:
+            bits = array(words.format, bytes(words))
+        if flip_y:
+            for stripe in range(0, stripes * h, h):
+                bits[stripe:stripe + h] = bits[stripe:stripe + h][::-1]
+        padding = stripes * word_bits - w if flip_x else 0
+        flipped_mask = pygame.Mask((w + padding, h))
+        memoryview(flipped_mask).cast("B")[:] = memoryview(bits).cast("B")
+        if padding:
+            # The padding bits of the last column ended up in front, shift them out.
+            padded_mask, flipped_mask = flipped_mask, pygame.Mask((w, h))
+            flipped_mask.draw(padded_mask, (-padding, 0))
+        return flipped_mask
 
     def blit(self, screen: pygame.Surface):
         """Blit an image's surface onto the screen."""
         screen.blit(self.surface, self.rect, colorkey=self.surface.get_colorkey())
 
+@dataclass(frozen = True)
+class FrameSet:
+    """Immutable animation frames loaded from an image file or a directory of images.
+    Built once per (path, colorkey, scaling, resolution) and shared by all sprites of a template,
+    so spawning sprites doesn't touch the file system."""
+    path: str
+    frames: tuple[Image, ...]
+    # Budgeted like the images, frame sets of live graphics stay cached
+    cache: ClassVar[ImageCache] = ImageCache("frame_sets", pinned = lambda: GraphicData.pinned_frame_sets(),
+                                             images = lambda frame_set: frame_set.frames)
+
+    @classmethod
+    def load(cls, path: str, colorkey: tuple = COLOR.BLACK, scaling_width: int | None = None,
+                scaling_height: int | None = None, scaling_factor: float | None = None) -> FrameSet:
+        """Return the shared frame set, load all images of a directory (sorted by name) on the first request."""
+        key = (str(path), colorkey, scaling_width, scaling_height, scaling_factor, Display.grid_width)
+        frame_set = cls.cache.get(key)
+        if frame_set is not None:
+            return frame_set
+        path_obj = Path(path)
+        if path_obj.is_dir():
+            image_paths = sorted([str(image_path) for image_path in path_obj.iterdir() if image_path.is_file()])
+        else:
+            image_paths = [str(path)]
+        frames = tuple(Image.load(image_path, colorkey, scaling_width, scaling_height, scaling_factor) for image_path in image_paths)
+        frame_set = cls(str(path), frames)
+        cls.cache[key] = frame_set
+        return frame_set
+
 @dataclass
 class GraphicData:
     """Capture graphical data allowing for animations.
     Provide exactly one of path, image or frames.
     For animated sprites, provide exactly one of fps, animation_time r frame_duration_ms
-    Missing attributes get calculated upon initialization."""
+    Missing attributes get calculated upon initialization.
+    Frames loaded from a path are the shared frames of a FrameSet, each GraphicData
+    only holds its sprite's current image. Reflecting it reflects the current image and records the
+    orientation in flip, the other frames get reflected when they're displayed (see frame)."""
     path: str | None = None
     image: Image | None = None
-    frames: list[Image] | None = None
+    frames: tuple[Image, ...] | list[Image] | None = None
     colorkey: tuple = COLOR.BLACK
     scaling_width: int | None = None
     scaling_height: int | None = None
@@ -155,24 +339,20 @@ class GraphicData:
     animation_time: float | None = None
     frame_duration_ms: int | None = None
     starting_frame: int = 0
+    flip: tuple[bool, bool] = (False, False)
+    live = WeakValueDictionary() # all existing graphic data by id, for memory accounting
 
     def __post_init__(self):
+        GraphicData.live[id(self)] = self
         if sum(arg is not None for arg in (self.path, self.image, self.frames)) != 1:
             raise ValueError("Provide exactly one of path, image or frames.")
         if self.path is not None:
-            # load image or frames, calculate remaining parameters
-            path_obj = Path(self.path)
-            if path_obj.is_dir():
-                # load all images in the given directory
-                image_paths = sorted([str(image_path) for image_path in path_obj.iterdir() if image_path.is_file()])
-                self.frames = [Image.load(image_path, self.colorkey, self.scaling_width, self.scaling_height, self.scaling_factor) for image_path in image_paths]
-                self.image = self.frames[self.starting_frame % len(self.frames)]
-            else:
-                self.image = Image.load(self.path, self.colorkey, self.scaling_width, self.scaling_height, self.scaling_factor)
-                self.frames = [self.image]
+            # get the shared frames, calculate remaining parameters
+            self.frames = FrameSet.load(self.path, self.colorkey, self.scaling_width, self.scaling_height, self.scaling_factor).frames
+            self.image = self.frames[self.starting_frame % len(self.frames)]
         elif self.image is not None:
             self.path = self.image.path
-            self.frames = [self.image]
+            self.frames = (self.image,)
         elif self.frames is not None:
             self.image = self.frames[self.starting_frame % len(self.frames)]
             self.path = str(Path(self.image.path).parent)
@@ -187,7 +367,27 @@ class GraphicData:
                 self.animation_time = len(self.frames) * self.frame_duration_ms / 1000
                 self.fps = len(self.frames) / self.animation_time
 
+    @classmethod
+    def pinned_images(cls) -> set[int]:
+        """Ids of the images used by live graphics, which must stay in the image caches."""
+        pinned = set()
+        for graphic in list(GraphicData.live.values()):
+            # graphics being initialized may not have their frames yet
+            pinned.add(id(graphic.image))
+            pinned.update(id(frame) for frame in graphic.frames or ())
+        return pinned
+
+    @classmethod
+    def pinned_frame_sets(cls) -> set[int]:
+        """Ids of the frame sets whose frames are used by live graphics."""
+        used = {id(graphic.frames) for graphic in list(GraphicData.live.values())}
+        return {id(frame_set) for frame_set in FrameSet.cache.values() if id(frame_set.frames) in used}
+
+    def frame(self, index: int) -> Image:
+        """Animation frame with the given index in the graphic's orientation."""
+        return Image.reflect(self.frames[index], *self.flip)
+
     def reflect(self, flip_x: bool, flip_y: bool):
-        """Reflect all images contained in a GraphicData object along specified axes."""
-        self.image = Image.reflect(self.image, flip_x, flip_y)
-        self.frames = [Image.reflect(frame, flip_x, flip_y) for frame in self.frames]
\ No newline at end of file
+        """Reflect the graphic along specified axes, the frames follow lazily when they're displayed."""
+        self.flip = (self.flip[0] != flip_x, self.flip[1] != flip_y)
+        self.image = Image.reflect(self.image, flip_x, flip_y)
\ No newline at end of file
@@ -0,0 +1,123 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+import pygame
+from .display import Display
+from .writer import ImageWriter
+from src.settings import PATH
+
+class ImageManifest:
+    """Manifest of the preprocessed images of one resolution, invalidating them when their source changes.
+
+    entries: Maps image paths relative to PATH.IMAGES to the digest of the source file they were built from,
+    the preprocessing parameters (colorkey and scaling) and whether they are packed in the image archive.
+    sources: Current size, modification time and digest of each source image, scanned once when loading the manifest.
+    Source files only get hashed again if their size or modification time changed.
+    A preprocessed image is fresh if its entry matches the current digest and requested parameters,
+    so lookups during the game are dict hits without touching the file system.
+
+    manifests: Loaded manifests by grid width.
+    pending: Images being preprocessed and saved, they get recorded once they are saved.
+    rebuild_thread: Thread rebuilding the stale entries in the background (started by Image.manifest)."""
+    manifests: dict[int, ImageManifest] = {}
+    lock = threading.RLock()
+
+    def __init__(self, grid_width: int):
+        self.path = PATH.PREPROCESSED / f"grid_width={grid_width}.manifest.json"
+        self.entries: dict[str, dict] = {}
+        self.sources: dict[str, list] = {}
+        self.dirty = False
+        self.pending: set[str] = set()
+        self.rebuild_thread = None
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                self.entries, self.sources = data["entries"], data["sources"]
+            except (ValueError, KeyError) as error:
+                print(f"Warning: Rebuilding the corrupt image manifest {self.path}: {error}")
+        self.scan()
+
+    @classmethod
+    def current(cls) -> ImageManifest:
+        """The manifest of the current resolution, loaded on the first request and saved when pygame quits."""
+        grid_width = Display.grid_width
+        with cls.lock:
+            if grid_width not in cls.manifests:
+                cls.manifests[grid_width] = cls(grid_width)
+                pygame.register_quit(cls.manifests[grid_width].close)
+            return cls.manifests[grid_width]
+
+    @staticmethod
+    def digest(path: Path) -> str:
+        return hashlib.blake2b(path.read_bytes(), digest_size = 16).hexdigest()
+
+    def scan(self):
+        """Update the signatures of all source images."""
+        sources = {}
+        for file in PATH.IMAGES.rglob("*.png"):
+            relpath = file.relative_to(PATH.IMAGES).as_posix()
+            stat = file.stat()
+            old = self.sources.get(relpath)
+            if old is not None and old[:2] == [stat.st_size, stat.st_mtime_ns]:
+                sources[relpath] = old
+            else:
+                sources[relpath] = [stat.st_size, stat.st_mtime_ns, self.digest(file)]
+        self.dirty |= sources != self.sources
+        self.sources = sources
+
+    @staticmethod
+    def parameters(colorkey: tuple, scaling_width: float | None,
+                scaling_height: float | None, scaling_factor: float | None) -> list:
+        """Preprocessing parameters in the manifest's (JSON) representation."""
+        return [list(colorkey) if colorkey else None, scaling_width, scaling_height, scaling_factor]
+
+    def is_fresh(self, relpath: str, parameters: list) -> bool:
+        entry = self.entries.get(relpath)
+        source = self.sources.get(relpath)
+        return (entry is not None and source is not None
+                and entry["source"] == source[2] and entry["parameters"] == parameters)
+
+    def is_packed(self, relpath: str) -> bool:
+        entry = self.entries.get(relpath)
+        return entry is not None and entry["packed"]
+
+    def record(self, relpath: str, parameters: list):
+        """Record a freshly preprocessed and saved image (not yet in the archive)."""
+        with self.lock:
+            self.pending.discard(relpath)
+            source = self.sources.get(relpath)
+            if source is None:
+                return
+            self.entries[relpath] = {"source": source[2], "parameters": parameters, "packed": False}
+            self.dirty = True
+
+    def mark_packed(self, relpaths: list[str]):
+        with self.lock:
+            for relpath in relpaths:
+                self.entries[relpath]["packed"] = True
+            self.dirty = True
+
+    def stale(self) -> dict[str, list]:
+        """Parameters of the recorded images whose source changed since they were preprocessed."""
+        with self.lock:
+            return {relpath: entry["parameters"] for relpath, entry in self.entries.items()
+                    if relpath in self.sources and not self.is_fresh(relpath, entry["parameters"])}
+
+    def close(self):
+        """Record the images still being saved and save the manifest."""
+        ImageWriter.close()
+        self.save()
+
+    def save(self):
+        """Write the manifest atomically if it changed."""
+        with self.lock:
+            if not self.dirty:
+                return
+            self.path.parent.mkdir(parents = True, exist_ok = True)
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            temp_path.write_text(json.dumps({"entries": self.entries, "sources": self.sources}))
+            os.replace(temp_path, self.path)
+            self.dirty = False
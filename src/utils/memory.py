@@ -0,0 +1,74 @@
+from __future__ import annotations
+import json
+from collections import deque
+from pathlib import Path
+from time import strftime
+from .image import Image, GraphicData, FrameSet
+from .cache import ImageCache, surface_bytes, mask_bytes
+
+class MemoryStats:
+    """Account the memory held by images: pixel and mask bytes of Image.cache,
+    of the reflected variants in it and of all live Image objects, the bytes counted against the budget by all image caches,
+    the number of live GraphicData and of shared frame sets, and the hits, misses and evictions of the image caches.
+    Snapshots get taken whenever a level starts, to see how the memory grows per level.
+
+    snapshots: Last reports labeled with the level and the growth since the previous snapshot."""
+    snapshots: deque[dict] = deque(maxlen = 1000)
+
+    @staticmethod
+    def image_stats(images) -> dict[str, int]:
+        """Number of images and bytes of their pixel and mask data, shared surfaces and masks count once."""
+        surfaces, masks = {}, {}
+        count = 0
+        for image in images:
+            count += 1
+            surfaces[id(image.surface)] = image.surface
+            masks[id(image.mask)] = image.mask
+        pixel_bytes = sum(surface_bytes(surface) for surface in surfaces.values())
+        mask_total = sum(mask_bytes(mask) for mask in masks.values())
+        return {"images": count, "pixel_bytes": pixel_bytes, "mask_bytes": mask_total,
+                "total_bytes": pixel_bytes + mask_total}
+
+    @classmethod
+    def report(cls) -> dict:
+        """Current memory usage of the image caches and live image objects."""
+        return {"cache": cls.image_stats(Image.cache.values()),
+                "reflected": cls.image_stats(image for image in Image.cache.values() if any(image.flip)),
+                "live_images": cls.image_stats(list(Image.live.values())),
+                "live_graphics": len(GraphicData.live),
+                "frame_sets": len(FrameSet.cache),
+                "cached_bytes": ImageCache.total_bytes(),
+                "cache_budget": ImageCache.budget,
+                "cache_stats": {cache.name: cache.stats() for cache in ImageCache.caches}}
+
+    @classmethod
+    def snapshot(cls, label: str) -> dict:
+        """Record the current report, e.g. when a level starts."""
+        report = cls.report()
+        report["label"] = label
+        report["time"] = strftime("%Y-%m-%d %H:%M:%S")
+        previous = cls.snapshots[-1] if cls.snapshots else None
+        report["growth_bytes"] = {name: report[name]["total_bytes"] - (previous[name]["total_bytes"] if previous else 0)
+                                  for name in ("cache", "reflected", "live_images")}
+        cls.snapshots.append(report)
+        return report
+
+    @classmethod
+    def summary(cls) -> str:
+        """One line summary of the current memory usage."""
+        report = cls.report()
+        cache, reflected, live = report["cache"], report["reflected"], report["live_images"]
+        stats = report["cache_stats"].values()
+        hits, misses = sum(cache_stats["hits"] for cache_stats in stats), sum(cache_stats["misses"] for cache_stats in stats)
+        evictions = sum(cache_stats["evictions"] for cache_stats in stats)
+        return (f"images: all caches {report['cached_bytes'] / 2**20:.1f} MB, cache {cache['total_bytes'] / 2**20:.1f} MB ({cache['images']}), "
+                f"reflected {reflected['total_bytes'] / 2**20:.1f} MB ({reflected['images']}), "
+                f"live {live['total_bytes'] / 2**20:.1f} MB ({live['images']}), graphics {report['live_graphics']}, "
+                f"hits {hits / max(hits + misses, 1):.0%}, evicted {evictions}")
+
+    @classmethod
+    def export(cls, path: str | Path):
+        """Write the current report and all snapshots to a JSON file."""
+        path = Path(path)
+        path.parent.mkdir(parents = True, exist_ok = True)
+        path.write_text(json.dumps({"current": cls.report(), "snapshots": list(cls.snapshots)}, indent = 2))
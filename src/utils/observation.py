@@ -0,0 +1,85 @@
+from __future__ import annotations
+import pygame
+from .display import Display
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Observation:
+    """Export the rendered game surface as NumPy arrays, e.g. for agents or visual tests.
+
+    Frames are captured from Display.screen, optionally downsampled into a small render target,
+    converted to grayscale and stacked. All frames live in a preallocated ring buffer,
+    which holds each frame twice (at index i and i + stack), so the most recent frames
+    are always a contiguous view and capturing allocates no new frame buffers.
+    Returned arrays are views of the ring buffer, valid until the frame gets overwritten.
+
+    size: tuple[int, int] | None - Size of the downsampled render target, None keeps the screen size.
+    grayscale: bool - Observe luma values instead of RGB colors.
+    stack: int - Number of most recent frames returned by capture, the oldest first.
+    shape: tuple - Shape of the returned arrays, (stack,) height, width (, 3)."""
+    GRAY_WEIGHTS = (77, 150, 29) # ITU-R BT.601 luma weights in units of 1/256
+
+    def __init__(self, size: tuple[int, int] | None = None, grayscale: bool = False, stack: int = 1):
+        if np is None:
+            raise ImportError("Observations require numpy.")
+        self.size = size or Display.screen_size
+        self.target = pygame.Surface(self.size, 0, Display.screen) if size else None
+        self.grayscale = grayscale
+        self.stack = stack
+        self.shape = self.shape_of(self.size, grayscale, stack)
+        frame_shape = self.shape[1:] if stack > 1 else self.shape
+        self.frames = np.zeros((2 * stack if stack > 1 else 1, *frame_shape), dtype=np.uint8)
+        self.index = 0
+        if grayscale:
+            self.luma = np.empty(self.size, dtype=np.uint16)
+            self.channel = np.empty(self.size, dtype=np.uint16)
+
+    @staticmethod
+    def shape_of(size: tuple[int, int], grayscale: bool = False, stack: int = 1) -> tuple[int, ...]:
+        """Shape of the arrays an observation with the given parameters returns."""
+        shape = (size[1], size[0]) if grayscale else (size[1], size[0], 3)
+        return (stack, *shape) if stack > 1 else shape
+
+    @staticmethod
+    def screen_view() -> np.ndarray:
+        """Zero-copy view of Display.screen of shape (width, height, 3).
+        The screen stays locked while the view is referenced, so delete it before blitting again."""
+        return pygame.surfarray.pixels3d(Display.screen)
+
+    def capture(self) -> np.ndarray:
+        """Capture the current screen as newest frame, return the observation."""
+        source = Display.screen
+        if self.target is not None:
+            pygame.transform.smoothscale(source, self.size, self.target)
+            source = self.target
+        pixels = pygame.surfarray.pixels3d(source)
+        frame = self.frames[self.index]
+        if self.grayscale:
+            np.multiply(pixels[:, :, 0], self.GRAY_WEIGHTS[0], out=self.luma, dtype=np.uint16)
+            for c in (1, 2):
+                np.multiply(pixels[:, :, c], self.GRAY_WEIGHTS[c], out=self.channel, dtype=np.uint16)
+                np.add(self.luma, self.channel, out=self.luma)
+            np.right_shift(self.luma, 8, out=frame.T, casting="unsafe")
+        else:
+            np.copyto(frame, pixels.transpose(1, 0, 2))
+        del pixels
+        if self.stack == 1:
+            return frame
+        np.copyto(self.frames[self.index + self.stack], frame)
+        self.index = (self.index + 1) % self.stack
+        return self.latest
+
+    def reset(self) -> np.ndarray:
+        """Capture the current screen and fill the whole stack with it (e.g. at the start of an episode)."""
+        frame = self.capture()
+        if self.stack > 1:
+            self.frames[:] = frame[-1]
+        return self.latest
+
+    @property
+    def latest(self) -> np.ndarray:
+        if self.stack == 1:
+            return self.frames[0]
+        return self.frames[self.index:self.index + self.stack]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import os
+from collections import deque
+from functools import wraps
+from pathlib import Path
+from time import perf_counter, strftime
+from typing import Callable
+from src.settings import PERFORMANCE, PATH
+
+class Perf:
+    """Collect per-frame timings of the game loop and its phases for the performance HUD.
+
+    Frame times are always measured: frames over budget get appended to the hitch log,
+    with the events of the frame as causes. The log stays open and its lines get written
+    once per FLUSH_INTERVAL, beyond PERFORMANCE.HITCH_LOG_SIZE it's rotated into a .1 file. Expensive one-off work like cache misses
+    reports itself with Perf.event.
+    Methods decorated with Perf.timed(phase) add their exclusive time (without nested
+    timed phases) to the current frame while phase timing is enabled, hitches then
+    also get logged with their phase breakdown. While disabled, timed methods only check a flag.
+
+    enabled: bool - Measure phases (toggled by the performance HUD).
+    history: dict mapping phases to the frame times in ms of the last HISTORY frames (while enabled).
+    hitches: Last over budget frames (ms, phase breakdown, causes).
+    log_lines: Hitch log lines waiting to be written."""
+    PHASES = ("handle_user_input", "Level.update_sprites", "Level.collision_checks",
+              "Level.blit", "Statusbar.blit", "Display.update")
+    HISTORY = 120
+    FLUSH_INTERVAL = 1.0 # s between writes of the hitch log
+    enabled: bool = False
+    budget: float = PERFORMANCE.FRAME_BUDGET
+    log_path: Path | None = PATH.HITCH_LOG
+    log_size: int = PERFORMANCE.HITCH_LOG_SIZE
+    log_file = None
+    log_lines: list[str] = []
+    log_flushed: float = 0.0
+    frame_start: float = 0.0
+    frame_count: int = 0
+    phases: dict[str, float] = {}
+    events: deque[str] = deque(maxlen=100) # also bounded if no frames end, e.g. in headless simulations
+    history: dict[str, deque[float]] = {}
+    hitches: deque[tuple[float, dict[str, float], list[str]]] = deque(maxlen=20)
+    _stack: list[float] = [] # time spent in nested phases of the running timed methods
+
+    @classmethod
+    def enable(cls, enabled: bool = True, budget: float | None = None, log_path: str | Path | None = None):
+        """Start or stop measuring phases. Frames longer than budget ms get logged into log_path."""
+        cls.enabled = enabled
+        if budget is not None:
+            cls.budget = budget
+        if log_path is not None and Path(log_path) != cls.log_path:
+            cls.close_log()
+            cls.log_path = Path(log_path)
+        cls.phases = {}
+        cls.history = {phase: deque(maxlen=cls.HISTORY) for phase in (*cls.PHASES, "total")}
+
+    @classmethod
+    def timed(cls, phase: str) -> Callable:
+        """Decorator adding the exclusive time of a method to the given phase."""
+        def decorator(method: Callable) -> Callable:
+            @wraps(method)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return method(*args, **kwargs)
+                cls._stack.append(0.0)
+                start = perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - start
+                    nested = cls._stack.pop()
+                    if cls._stack:
+                        cls._stack[-1] += elapsed
+                    cls.phases[phase] = cls.phases.get(phase, 0.0) + elapsed - nested
+            return wrapper
+        return decorator
+
+    @classmethod
+    def event(cls, cause: str):
+        """Report a possible cause of a hitch during the current frame."""
+        cls.events.append(cause)
+
+    @classmethod
+    def begin_frame(cls):
+        """Start measuring a frame (after the frame rate limiter waited)."""
+        cls.frame_start = perf_counter()
+
+    @classmethod
+    def end_frame(cls, context: str = ""):
+        """Finish the current frame: store its phase times (if enabled) and log it if it was over budget."""
+        total = 1000 * (perf_counter() - cls.frame_start)
+        cls.frame_count += 1
+        phases = {}
+        if cls.enabled:
+            phases = {phase: 1000 * cls.phases.get(phase, 0.0) for phase in cls.PHASES}
+            for phase, ms in phases.items():
+                cls.history[phase].append(ms)
+            cls.history["total"].append(total)
+            cls.phases = {}
+        if total > cls.budget:
+            cls.hitch(total, phases, context)
+        if cls.log_lines and perf_counter() - cls.log_flushed >= cls.FLUSH_INTERVAL:
+            cls.flush_log()
+        cls.events.clear()
+
+    @classmethod
+    def hitch(cls, total: float, phases: dict[str, float], context: str):
+        events = list(cls.events)
+        cls.hitches.append((total, phases, events))
+        if cls.log_path is None:
+            return
+        breakdown = ", ".join(f"{phase} {ms:.1f}" for phase, ms in phases.items() if ms >= 0.05) or "phases not measured"
+        causes = "; ".join(f"{cause} x{events.count(cause)}" if events.count(cause) > 1 else cause
+                           for cause in dict.fromkeys(events)) or "unknown"
+        cls.log_lines.append(f"{strftime('%Y-%m-%d %H:%M:%S')} frame {cls.frame_count} {context} "
+                             f"{total:.1f} ms > {cls.budget:.1f} ms | {breakdown} | causes: {causes}\n")
+
+    @classmethod
+    def flush_log(cls):
+        """Write the buffered hitch log lines, rotate the log once it exceeds its size."""
+        cls.log_flushed = perf_counter()
+        if cls.log_path is None or not cls.log_lines:
+            cls.log_lines = []
+            return
+        if cls.log_file is None:
+            cls.log_path.parent.mkdir(parents=True, exist_ok=True)
+            cls.log_file = open(cls.log_path, "a")
+        cls.log_file.writelines(cls.log_lines)
+        cls.log_file.flush()
+        cls.log_lines = []
+        if cls.log_file.tell() > cls.log_size:
+            cls.log_file.close()
+            cls.log_file = None
+            os.replace(cls.log_path, cls.log_path.with_name(cls.log_path.name + ".1"))
+
+    @classmethod
+    def close_log(cls):
+        """Write the remaining hitch log lines and close the log, e.g. when the game exits."""
+        cls.flush_log()
+        if cls.log_file is not None:
+            cls.log_file.close()
+            cls.log_file = None
@@ -1,12 +1,16 @@
 from __future__ import annotations
 from math import sqrt, sin, cos, pi
-from random import uniform
+import random
 from collections.abc import Iterator
 from typing import Any
 
 class Vector:
     """Simple class for 2d vector calculus,
-    could also be replaced by pygames Vector2 class."""
+    could also be replaced by pygames Vector2 class.
+    Operators return new vectors, methods ending with an underscore
+    (and iadd, set, clamp_into) change the vector in place and return it,
+    avoiding allocations in the game's hot paths."""
+    __slots__ = ("x", "y")
 
     def __init__(self, x: int | float, y: int | float):
         self.x = x
@@ -25,32 +29,68 @@ class Vector:
         """scalar product or multiplication with scalars"""
         if isinstance(other, Vector):
             return self.x * other.x + self.y * other.y
-        elif isinstance(other, (int, float)):
-            return Vector(other * self.x, other * self.y)
-        return NotImplemented
+        return Vector(other * self.x, other * self.y)
 
-    def __rmul__(self, other: Vector | int | float) -> int | float | Vector:
-        """allows also for multiplication with scalars from the right"""
-        return self * other
+    def __rmul__(self, other: int | float) -> Vector:
+        """allows also for multiplication with scalars from the left"""
+        return Vector(other * self.x, other * self.y)
 
     def __truediv__(self, s: int | float) -> Vector:
-        if isinstance(s, (int, float)):
-            if s == 0:
-                raise ValueError("Division by zero")
-            return self * (1 / s)
-        return NotImplemented
+        if s == 0:
+            raise ValueError("Division by zero")
+        return Vector(self.x / s, self.y / s)
 
     def __iter__(self) -> Iterator[Any]:
         yield self.x
         yield self.y
 
+    def __repr__(self) -> str:
+        return f"Vector({self.x}, {self.y})"
+
+    def copy(self) -> Vector:
+        return Vector(self.x, self.y)
+
+    # In-place variants of the operations above
+    def set(self, x: int | float, y: int | float) -> Vector:
+        self.x = x
+        self.y = y
+        return self
+
+    def iadd(self, other: Vector, factor: int | float = 1) -> Vector:
+        """Adds factor * other in place"""
+        self.x += factor * other.x
+        self.y += factor * other.y
+        return self
+
+    def scale_(self, s: int | float) -> Vector:
+        """Multiplies with a scalar in place"""
+        self.x *= s
+        self.y *= s
+        return self
+
+    def normalize_(self) -> Vector:
+        """Changes norm of the vector to 1 in place (zero vector stays zero)"""
+        n = sqrt(self.x * self.x + self.y * self.y)
+        if n != 0:
+            self.x /= n
+            self.y /= n
+        return self
+
+    def clamp_into(self, x_min: int | float, y_min: int | float,
+                        x_max: int | float, y_max: int | float) -> Vector:
+        """Clamps x and y coordinates in place to the given ranges"""
+        self.x = max(x_min, min(self.x, x_max))
+        self.y = max(y_min, min(self.y, y_max))
+        return self
+
     def change_direction(self, other: Vector) -> Vector:
-        """Changes direction of a vector while preserving its norm"""
-        self = self.norm * other.normalize
+        """Changes direction of a vector in place while preserving its norm"""
+        n = self.norm
+        return self.set(other.x, other.y).normalize_().scale_(n)
 
     def change_norm(self, n: int | float) -> Vector:
-        """Changes norm of a vector while preserving its direction"""
-        self = n * self.normalize
+        """Changes norm of a vector in place while preserving its direction"""
+        return self.normalize_().scale_(n)
 
     def clamp(self, min_v: Vector, max_v: Vector) -> Vector:
         """Clamps x and y coordinates of vector to minimal or maximal possible value
@@ -61,20 +101,23 @@ class Vector:
         )
 
     def randomize_direction(self, phi_min: float = 0,
-                                phi_max: float = 2 * pi) -> Vector:
-        """Changes direction of a vector randomly while preserving its norm"""
-        phi = uniform(phi_min, phi_max)
-        self = self.norm * Vector(cos(phi), sin(phi))
+                                phi_max: float = 2 * pi,
+                                rng: random.Random | None = None) -> Vector:
+        """Changes direction of a vector randomly in place while preserving its norm.
+        Draws from the given random number generator (or the global one)."""
+        phi = (rng or random).uniform(phi_min, phi_max)
+        n = self.norm
+        return self.set(n * cos(phi), n * sin(phi))
 
     @property
     def norm(self) -> int | float:
         """Euclidean norm of a vector"""
-        return sqrt(self * self)
+        return sqrt(self.x * self.x + self.y * self.y)
 
     @property
     def norm2(self) -> int | float:
         """Square of Euclidean norm; avoids computing sqrt function for faster computations"""
-        return self * self
+        return self.x * self.x + self.y * self.y
 
     @property
     def normalize(self) -> Vector:
@@ -84,17 +127,23 @@ class Vector:
 
     @staticmethod
     def random_direction(phi_min: float = 0,
-                        phi_max: float = 2 * pi) -> Vector:
-        """Returns a random unit vector"""
-        phi = uniform(phi_min, phi_max)
+                        phi_max: float = 2 * pi,
+                        rng: random.Random | None = None) -> Vector:
+        """Returns a random unit vector drawn from the given random number generator (or the global one)"""
+        phi = (rng or random).uniform(phi_min, phi_max)
         return Vector(cos(phi), sin(phi))
 
     def turn_by_angle(self, phi: float) -> Vector:
         """Turns a vector by a given angle (in radians), counterclockwise"""
         return Vector(self.x*cos(phi)-self.y*sin(phi), self.x*sin(phi)+self.y*cos(phi))
 
+# Shared zero vector, e.g. as default acceleration. Must never be changed in place.
+ZERO = Vector(0, 0)
+
 class Ball:
     """Simple class for computations of moving 3d balls"""
+    __slots__ = ("pos", "vel", "r")
+
     def __init__(self, pos: Vector, vel: Vector, r: float):
         self.pos, self.vel, self.r = pos, vel, r
 
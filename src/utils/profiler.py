@@ -0,0 +1,84 @@
+from __future__ import annotations
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import CodeType
+from typing import Callable
+
+class SamplingProfiler:
+    """Low-overhead statistical profiler of the main thread.
+
+    A background thread periodically samples the main thread's call stack, so
+    the profiled code runs unmodified (unlike with cProfile, which inflates the cost
+    of small functions like Vector operations or properties by instrumenting every call).
+    Samples get prefixed with the tags returned by the tags callback at sampling time,
+    e.g. the game mode and level number, and are written in the collapsed stack format
+    ("tag;...;outer;inner count" per line) read by flamegraph.pl, speedscope or inferno.
+
+    interval: float - Seconds between samples.
+    tags: Callable returning strings to prefix the sampled stacks with."""
+
+    def __init__(self, interval: float = 0.002, tags: Callable[[], tuple[str, ...]] | None = None):
+        self.interval = interval
+        self.tags = tags or (lambda: ())
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.labels: dict[CodeType, str] = {}
+        self.thread_id = threading.main_thread().ident
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start sampling the main thread in a daemon thread."""
+        # The sampler can only run when the main thread releases the GIL,
+        # so the switch interval limits the sampling rate.
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.switch_interval, self.interval / 2))
+        self.stopped.clear()
+        self.thread = threading.Thread(target = self.run, name = "SamplingProfiler", daemon = True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+            sys.setswitchinterval(self.switch_interval)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self.label(frame.f_code))
+                frame = frame.f_back
+            try:
+                tags = tuple(self.tags())
+            except Exception:
+                tags = ("unknown",)
+            self.samples[tags + tuple(reversed(stack))] += 1
+
+    def label(self, code: CodeType) -> str:
+        """Function name with file and line of its definition, e.g. 'Level.update (level.py:262)'."""
+        label = self.labels.get(code)
+        if label is None:
+            label = f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+            self.labels[code] = label
+        return label
+
+    def write(self, path: str | Path):
+        """Write the collapsed stacks, the most frequent first."""
+        path = Path(path)
+        path.parent.mkdir(parents = True, exist_ok = True)
+        with open(path, "w") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{';'.join(part.replace(';', ',') for part in stack)} {count}\n")
+
+    def __enter__(self) -> SamplingProfiler:
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from src.sprite import Sprite
+
+import pygame
+
+class SpatialHash:
+    """Uniform grid of square cells indexing sprites by the cells their rect covers.
+    Used as broad phase for collision checks: only sprites sharing a cell
+    with a given rectangle have to be tested pixel-perfectly with their masks.
+
+    cell_size: int - Width of the square cells, usually Display.grid_width.
+    cells: dict mapping cell coordinates to the sprites covering the cell.
+    Sprites that are members of several groups sharing the hash are counted,
+    they are removed from the index once they left all of these groups."""
+
+    def __init__(self, cell_size: int):
+        self.cell_size = max(1, int(cell_size))
+        self.cells: dict[tuple[int, int], dict[Sprite, None]] = {}
+        self.bounds: dict[Sprite, tuple[int, int, int, int]] = {}
+        self.counts: dict[Sprite, int] = {}
+
+    def cell_bounds(self, rect: pygame.Rect) -> tuple[int, int, int, int]:
+        """Range of cells x_min, y_min, x_max, y_max covered by a rectangle."""
+        c = self.cell_size
+        return (rect.left // c, rect.top // c,
+                (rect.left + max(rect.w, 1) - 1) // c, (rect.top + max(rect.h, 1) - 1) // c)
+
+    def insert(self, sprite: Sprite):
+        """Index a sprite at its current rect (or count another membership)."""
+        if sprite in self.counts:
+            self.counts[sprite] += 1
+            return
+        self.counts[sprite] = 1
+        sprite.spatial_hash = self
+        self._add_to_cells(sprite, self.cell_bounds(sprite.rect))
+
+    def remove(self, sprite: Sprite):
+        """Remove one membership of a sprite, unindex it if it was the last one."""
+        if sprite not in self.counts:
+            return
+        self.counts[sprite] -= 1
+        if self.counts[sprite] > 0:
+            return
+        del self.counts[sprite]
+        self._remove_from_cells(sprite, self.bounds.pop(sprite))
+        if sprite.spatial_hash is self:
+            sprite.spatial_hash = None
+
+    def update(self, sprite: Sprite):
+        """Reindex a sprite after its rect moved or changed its size.
+        Does nothing as long as it covers the same cells as before."""
+        bounds = self.cell_bounds(sprite.rect)
+        old_bounds = self.bounds.get(sprite)
+        if old_bounds is None or bounds == old_bounds:
+            return
+        self._remove_from_cells(sprite, old_bounds)
+        self._add_to_cells(sprite, bounds)
+
+    def _add_to_cells(self, sprite: Sprite, bounds: tuple[int, int, int, int]):
+        self.bounds[sprite] = bounds
+        x_min, y_min, x_max, y_max = bounds
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                self.cells.setdefault((x, y), {})[sprite] = None
+
+    def _remove_from_cells(self, sprite: Sprite, bounds: tuple[int, int, int, int]):
+        x_min, y_min, x_max, y_max = bounds
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                cell = self.cells[(x, y)]
+                del cell[sprite]
+                if not cell:
+                    del self.cells[(x, y)]
+
+    def query(self, rect: pygame.Rect) -> list[Sprite]:
+        """Return all indexed sprites whose rect intersects the given rectangle."""
+        found = {}
+        x_min, y_min, x_max, y_max = self.cell_bounds(rect)
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                cell = self.cells.get((x, y))
+                if cell:
+                    found.update(cell)
+        return [sprite for sprite in found if rect.colliderect(sprite.rect)]
+
+    def clear(self):
+        for sprite in self.counts:
+            if sprite.spatial_hash is self:
+                sprite.spatial_hash = None
+        self.cells.clear()
+        self.bounds.clear()
+        self.counts.clear()
+
+class SpatialGroup(pygame.sprite.Group):
+    """Sprite group keeping its members indexed in a (possibly shared) SpatialHash."""
+
+    def __init__(self, spatial_hash: SpatialHash, *sprites):
+        self.spatial_hash = spatial_hash
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite: Sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.spatial_hash.insert(sprite)
+
+    def remove_internal(self, sprite: Sprite):
+        super().remove_internal(sprite)
+        self.spatial_hash.remove(sprite)
+
+    def nearby(self, rect: pygame.Rect) -> list[Sprite]:
+        """Members of the group whose rect intersects the given rectangle."""
+        return [sprite for sprite in self.spatial_hash.query(rect) if sprite in self.spritedict]
+
+    def collide(self, sprite: Sprite) -> list[Sprite]:
+        """Members of the group colliding pixel-perfectly with the given sprite."""
+        return [other for other in self.nearby(sprite.rect)
+                if other is not sprite and pygame.sprite.collide_mask(sprite, other)]
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from random import randint
+import random
 
 class Timer:
     """Simple timer with pause functionality. Measures time in ms."""
@@ -41,11 +41,14 @@ class ActionTimer(Timer):
     
     def __init__(self, alarm_min: int | None = None,
                         alarm_max: int | None = None,
-                        cyclic: bool = True):
+                        cyclic: bool = True,
+                        rng: random.Random | None = None):
         """Set an alarm of a given time (if one number is provided)
         or randomly within a given range (if both numbers are provided).
-        If cyclic is True, a new random alarm time gets chosen automatically."""
+        If cyclic is True, a new random alarm time gets chosen automatically.
+        Random alarm times are drawn from rng (or the global random number generator)."""
         super().__init__()
+        self.rng = rng
         self.set_alarm(alarm_min, alarm_max, cyclic)
 
     def set_alarm(self, alarm_min: int | None = None,
@@ -68,7 +71,7 @@ class ActionTimer(Timer):
             return self.alarm_max
         if self.alarm_min > self.alarm_max:
             self.alarm_min, self.alarm_max = self.alarm_max, self.alarm_min
-        return randint(self.alarm_min, self.alarm_max)        
+        return (self.rng or random).randint(self.alarm_min, self.alarm_max)        
  
     def check_alarm(self) -> bool:
         """Return True (only once) when timer reaches its alarm time.
@@ -0,0 +1,80 @@
+from __future__ import annotations
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable
+import pygame
+from src.settings import PERFORMANCE
+
+class ImageWriter:
+    """Write-behind persistence of preprocessed images.
+    Saving a PNG takes milliseconds, so images are queued and saved by a background thread
+    instead of on the frame where a sprite spawns first. The bounded queue blocks the game
+    only if the writer falls far behind. Images are saved to a temporary file and renamed,
+    so an interrupted write never leaves a truncated PNG in the disk cache.
+    The queue gets flushed when pygame quits."""
+    queue: queue.Queue | None = None
+    thread: threading.Thread | None = None
+    lock = threading.Lock()
+
+    @classmethod
+    def start(cls):
+        """Start the writer thread (once)."""
+        with cls.lock:
+            if cls.thread is not None:
+                return
+            cls.queue = queue.Queue(maxsize = PERFORMANCE.IMAGE_WRITE_QUEUE)
+            cls.thread = threading.Thread(target = cls.run, name = "ImageWriter", daemon = True)
+            cls.thread.start()
+            pygame.register_quit(cls.close)
+
+    @classmethod
+    def save(cls, surface: pygame.Surface, path: str | Path, saved: Callable[[], None] | None = None):
+        """Queue a surface to be saved to the given path. The surface must not be modified afterwards.
+        saved: called in the writer thread once the file is in place."""
+        if cls.thread is None:
+            cls.start()
+        cls.queue.put((surface, Path(path), saved))
+
+    @classmethod
+    def run(cls):
+        while True:
+            item = cls.queue.get()
+            try:
+                if item is None:
+                    return
+                cls.write(*item)
+            except (pygame.error, OSError) as error:
+                print(f"Warning: Couldn't save preprocessed image {item[1]}: {error}")
+            finally:
+                cls.queue.task_done()
+
+    @staticmethod
+    def write(surface: pygame.Surface, path: Path, saved: Callable[[], None] | None = None):
+        """Save atomically: write a temporary file (with the format's suffix) and rename it."""
+        path.parent.mkdir(parents = True, exist_ok = True)
+        temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+        try:
+            pygame.image.save(surface, str(temp_path))
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok = True)
+        if saved is not None:
+            saved()
+
+    @classmethod
+    def flush(cls):
+        """Block until all queued images are saved."""
+        if cls.thread is not None:
+            cls.queue.join()
+
+    @classmethod
+    def close(cls):
+        """Save the remaining images and stop the writer thread."""
+        with cls.lock:
+            if cls.thread is None:
+                return
+            cls.queue.put(None)
+            cls.thread.join()
+            cls.thread = cls.queue = None